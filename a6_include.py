@@ -25,17 +25,16 @@ class DynamicArray:
 
     def __iter__(self):
         """
-        Disable iterator capability for DynamicArray class
-        This means loops and aggregate functions like
-        those shown below won't work:
-
-        da = DynamicArray()
-        for value in da:        # will not work
-        min(da)                 # will not work
-        max(da)                 # will not work
-        sort(da)                # will not work
+        Iterate over the elements of the array, front to back.
+        Raises RuntimeError if elements are appended or popped
+        while the iteration is running.
         """
-        return None
+        data = self._data
+        length = len(data)
+        for index in range(length):
+            if len(data) != length:
+                raise RuntimeError('DynamicArray changed size during iteration')
+            yield data[index]
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
@@ -78,6 +77,57 @@ class DynamicArray:
         return len(self._data)
 
 
+class FreeList:
+    """
+    Pool of spare node/entry objects of one class.
+    Removed or dropped objects are handed back with release() and
+    handed out again by acquire(), so churn-heavy workloads allocate
+    (and garbage collect) far fewer objects.
+    Supported methods are: acquire, release, length
+    """
+
+    def __init__(self, cls: type, limit: int = 1024) -> None:
+        """
+        Initialize an empty pool for objects of cls, keeping at
+        most limit spare objects. A limit of 0 disables pooling.
+        """
+        self._cls = cls
+        self._free = []
+        self.limit = limit
+
+    def acquire(self):
+        """Return a spare object, or None if the pool is empty."""
+        # pools are shared by every map in the process, so another
+        # thread may empty the list between a check and the pop;
+        # the pop itself is atomic
+        try:
+            return self._free.pop()
+        except IndexError:
+            return None
+
+    def release(self, obj) -> None:
+        """
+        Hand an object back to the pool.
+        Subclass instances are not pooled, since acquire() must
+        always return a plain instance of the pooled class.
+        """
+        if type(obj) is self._cls and len(self._free) < self.limit:
+            obj.clear()
+            self._free.append(obj)
+
+    def length(self) -> int:
+        """Return the number of spare objects in the pool."""
+        return len(self._free)
+
+
+def to_list(items) -> list:
+    """
+    Return the contents of a DynamicArray or any other iterable
+    as a plain list, for the HashMap batch methods.
+    """
+    return list(items)
+
+
 def hash_function_1(key: str) -> int:
     """Sample Hash function #1 to be used with HashMap implementation"""
     hash = 0
@@ -103,17 +153,34 @@ class SLNode:
     Singly Linked List node for use in a hash map
     """
 
-    def __init__(self, key: str, value: object, next: "SLNode" = None) -> None:
-        """Initialize node given a key and value."""
+    # no per-instance __dict__; saves memory on every stored key
+    __slots__ = ('key', 'value', 'next', 'hash')
+
+    def __init__(self, key: str, value: object, next: "SLNode" = None,
+                 hash: int = None) -> None:
+        """
+        Initialize node given a key and value.
+        hash caches the key's hash code so the table can be
+        rehashed without calling the hash function again.
+        """
         self.key = key
         self.value = value
         self.next = next
+        self.hash = hash
+
+    def clear(self) -> None:
+        """Drop references so a pooled node doesn't keep them alive."""
+        self.key = self.value = self.next = self.hash = None
 
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return '(' + str(self.key) + ': ' + str(self.value) + ')'
 
 
+# spare nodes recycled by LinkedList.insert() and remove()
+node_pool = FreeList(SLNode)
+
+
 class LinkedListIterator:
     """
     Separate iterator class for LinkedList
@@ -168,35 +235,69 @@ class LinkedList:
         """Return an iterator for the list, starting at the head."""
         return LinkedListIterator(self._head)
 
-    def insert(self, key: str, value: object) -> None:
-        """Insert new node at front of the list."""
-        self._head = SLNode(key, value, self._head)
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node at front of the list and return it."""
+        node = node_pool.acquire()
+        if node is None:
+            node = SLNode(key, value, self._head, hash)
+        else:
+            node.key, node.value, node.next, node.hash = (
+                key, value, self._head, hash)
+        self._head = node
         self._size += 1
+        return node
 
-    def remove(self, key: str) -> bool:
+    def insert_node(self, node: SLNode) -> None:
+        """
+        Link an existing node in at the front of the list.
+        Used when rehashing, so nodes move between lists
+        instead of being copied.
+        """
+        node.next = self._head
+        self._head = node
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None, recycle: bool = True) -> bool:
         """
         Remove first node with matching key.
         Return True if removal was successful, False otherwise.
+        If the key's hash is given, nodes whose cached hash differs
+        are skipped without comparing keys.
+        With recycle False the node is left intact rather than handed
+        to the pool, for lists that are read without a lock.
         """
         previous, node = None, self._head
         while node:
 
-            if node.key == key:
+            if (hash is None or node.hash == hash) and node.key == key:
                 if previous:
                     previous.next = node.next
                 else:
                     self._head = node.next
                 self._size -= 1
+                if recycle:
+                    node_pool.release(node)
                 return True
 
             previous, node = node, node.next
         return False
 
-    def contains(self, key: str) -> SLNode:
-        """Return node with matching key, or None if no match"""
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match
+        If the key's hash is given, nodes whose cached hash differs
+        are skipped without comparing keys.
+        """
         node = self._head
+        if hash is None:
+            while node:
+                if node.key == key:
+                    return node
+                node = node.next
+            return node
+
         while node:
-            if node.key == key:
+            if node.hash == hash and node.key == key:
                 return node
             node = node.next
         return node
@@ -210,14 +311,30 @@ class LinkedList:
 
 class HashEntry:
 
-    def __init__(self, key: str, value: object) -> None:
-        """Initialize an entry for use in a hash map."""
+    # no per-instance __dict__; saves memory on every stored key
+    __slots__ = ('key', 'value', 'hash', 'is_tombstone')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """
+        Initialize an entry for use in a hash map.
+        hash caches the key's hash code for rehashing.
+        """
         self.key = key
         self.value = value
+        self.hash = hash
 
         # Set this value to True when you "delete" a HashEntry
         self.is_tombstone = False
 
+    def clear(self) -> None:
+        """Drop references so a pooled entry doesn't keep them alive."""
+        self.key = self.value = self.hash = None
+        self.is_tombstone = False
+
     def __str__(self) -> str:
         """Override string method to provide more readable output."""
         return f"K: {self.key} V: {self.value} TS: {self.is_tombstone}"
+
+
+# spare entries recycled by the OA HashMap when tombstones are dropped
+entry_pool = FreeList(HashEntry)
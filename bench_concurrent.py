@@ -0,0 +1,207 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Multi-threaded stress test and throughput benchmark for
+#              ConcurrentHashMap, against a separate chaining HashMap
+#              wrapped in a single lock.
+#
+# Usage: python bench_concurrent.py [-t THREADS ...] [-n OPS] [--stress-only]
+
+
+import argparse
+import random
+import sys
+import threading
+from time import perf_counter
+
+import hash_map_sc
+from hash_functions import blake2b_64
+from hash_map_concurrent import ConcurrentHashMap
+
+
+class LockedHashMap:
+    """A separate chaining HashMap behind one lock, the usual workaround."""
+
+    def __init__(self) -> None:
+        """Initialize an empty map and its lock."""
+        self._map = hash_map_sc.HashMap(11, blake2b_64)
+        self._lock = threading.Lock()
+
+    def put(self, key, value) -> None:
+        """Put under the lock."""
+        with self._lock:
+            self._map.put(key, value)
+
+    def get(self, key) -> object:
+        """Get under the lock."""
+        with self._lock:
+            return self._map.get(key)
+
+    def remove(self, key) -> None:
+        """Remove under the lock."""
+        with self._lock:
+            self._map.remove(key)
+
+    def increment(self, key, delta: int = 1) -> int:
+        """Increment under the lock."""
+        with self._lock:
+            return self._map.increment(key, delta)
+
+
+def run_threads(count: int, work) -> float:
+    """
+    Run work(thread_index) on count threads started together.
+    Return the wall clock seconds until the last one finished.
+    """
+    barrier = threading.Barrier(count + 1)
+    errors = []
+
+    def target(thread_index: int) -> None:
+        barrier.wait()
+        try:
+            work(thread_index)
+        except Exception as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=target, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = perf_counter()
+    for thread in threads:
+        thread.join()
+    seconds = perf_counter() - start
+    if errors:
+        raise errors[0]
+    return seconds
+
+
+def stress(threads: int, ops: int, seed: int = 0) -> list:
+    """
+    Hammer one ConcurrentHashMap from several threads and check it
+    afterwards. Every thread:
+      - increments a small set of shared counters,
+      - puts, overwrites and removes keys of its own,
+      - races put_if_absent on shared keys,
+      - reads shared keys while the table keeps growing.
+    Return a list of failure messages, empty if the map held up.
+    """
+    hash_map = ConcurrentHashMap(11, blake2b_64, stripes=8)
+    counters = ['counter-%d' % i for i in range(16)]
+    winners = {}
+    winners_lock = threading.Lock()
+
+    def work(thread_index: int) -> None:
+        rnd = random.Random(seed + thread_index)
+        for i in range(ops):
+            hash_map.increment(counters[i % len(counters)])
+            own = 't%d-%d' % (thread_index, i)
+            hash_map.put(own, i)
+            hash_map.put(own, -i)
+            if i % 3 == 0:
+                hash_map.remove(own)
+            shared = 'shared-%d' % rnd.randrange(ops)
+            if hash_map.put_if_absent(shared, thread_index) is None:
+                with winners_lock:
+                    winners.setdefault(shared, []).append(thread_index)
+            value = hash_map.get(shared)
+            if value is None or not 0 <= value < threads:
+                raise AssertionError('bad read of %s: %r' % (shared, value))
+
+    # switch threads far more often than usual to shake out races
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        run_threads(threads, work)
+    finally:
+        sys.setswitchinterval(interval)
+
+    failures = []
+    total = sum(hash_map.get(counter) or 0 for counter in counters)
+    if total != threads * ops:
+        failures.append('counters sum to %d, expected %d'
+                        % (total, threads * ops))
+    for shared, indexes in winners.items():
+        if len(indexes) != 1:
+            failures.append('%s added by %d threads' % (shared, len(indexes)))
+        elif hash_map.get(shared) != indexes[0]:
+            failures.append('%s holds a loser\'s value' % shared)
+    for thread_index in range(threads):
+        for i in range(ops):
+            expected = None if i % 3 == 0 else -i
+            if hash_map.get('t%d-%d' % (thread_index, i)) != expected:
+                failures.append('t%d-%d is wrong' % (thread_index, i))
+                break
+
+    expected_size = len(counters) + len(winners) + threads * (ops - (ops + 2) // 3)
+    if hash_map.get_size() != expected_size:
+        failures.append('size is %d, expected %d'
+                        % (hash_map.get_size(), expected_size))
+    pairs = list(hash_map.items())
+    if len(pairs) != expected_size or len(set(k for k, _ in pairs)) != len(pairs):
+        failures.append('iteration saw %d pairs, expected %d distinct'
+                        % (len(pairs), expected_size))
+    return failures
+
+
+def throughput(make_map, threads: int, ops: int, seed: int = 0) -> float:
+    """
+    Return the operations per second of threads threads each running
+    ops operations (80% get, 15% put, 5% remove) on one shared map.
+    """
+    hash_map = make_map()
+    keyspace = ['key-%d' % i for i in range(ops)]
+    for key in keyspace:
+        hash_map.put(key, 0)
+
+    def work(thread_index: int) -> None:
+        rnd = random.Random(seed + thread_index)
+        for _ in range(ops):
+            key = keyspace[rnd.randrange(len(keyspace))]
+            roll = rnd.random()
+            if roll < 0.8:
+                hash_map.get(key)
+            elif roll < 0.95:
+                hash_map.put(key, roll)
+            else:
+                hash_map.remove(key)
+
+    seconds = run_threads(threads, work)
+    return threads * ops / seconds
+
+
+def main() -> None:
+    """Parse the command line, run the stress test and the benchmark."""
+    parser = argparse.ArgumentParser(
+        description='Stress test and throughput of ConcurrentHashMap.')
+    parser.add_argument('-t', '--threads', type=int, nargs='+',
+                        default=[1, 2, 4, 8],
+                        help='thread counts to benchmark (default 1 2 4 8)')
+    parser.add_argument('-n', '--ops', type=int, default=20000,
+                        help='operations per thread (default 20000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--stress-only', action='store_true',
+                        help='run only the stress test')
+    args = parser.parse_args()
+
+    failures = stress(max(args.threads), args.ops, args.seed)
+    for failure in failures:
+        print('FAIL', failure)
+    print('stress test', 'failed' if failures else 'passed')
+    if failures:
+        sys.exit(1)
+    if args.stress_only:
+        return
+
+    maps = {
+        'concurrent': lambda: ConcurrentHashMap(11, blake2b_64),
+        'single_lock': LockedHashMap,
+    }
+    print('{:<7} {:>14} {:>14}'.format('threads', *maps))
+    for threads in args.threads:
+        rates = [throughput(make_map, threads, args.ops, args.seed)
+                 for make_map in maps.values()]
+        print('{:<7} {:>14.0f} {:>14.0f}'.format(threads, *rates))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Measures bytes per entry and garbage collector work for
+#              the slotted, pooled SLNode / HashEntry types.
+#
+# Usage: python bench_memory.py [-n ENTRIES]
+
+
+import argparse
+import gc
+import tracemalloc
+
+import a6_include
+import hash_map_oa
+import hash_map_sc
+from hash_functions import blake2b_64
+
+
+class _DictNode:
+    """SLNode as it was before __slots__, kept as a reference point."""
+
+    def __init__(self, key, value, next=None, hash=None) -> None:
+        self.key = key
+        self.value = value
+        self.next = next
+        self.hash = hash
+
+
+def bytes_per_object(cls, n: int) -> float:
+    """Return the average bytes allocated per instance of cls."""
+    tracemalloc.start()
+    objects = [cls(i, i) for i in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # the list holding the objects costs one pointer per object
+    return current / n - 8 if objects else 0.0
+
+
+def bytes_per_entry(make_map, keys: list) -> float:
+    """Return the bytes allocated per key while filling a new map."""
+    tracemalloc.start()
+    hash_map = make_map()
+    for key in keys:
+        hash_map.put(key, None)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(keys)
+
+
+def churn_collections(make_map, keys: list, rounds: int) -> int:
+    """
+    Insert and remove every key rounds times.
+    Return how many young generation collections that triggered.
+    """
+    hash_map = make_map()
+    gc.collect()
+    before = gc.get_stats()[0]['collections']
+    for _ in range(rounds):
+        for key in keys:
+            hash_map.put(key, None)
+        for key in keys:
+            hash_map.remove(key)
+    return gc.get_stats()[0]['collections'] - before
+
+
+def run(n: int) -> dict:
+    """Run every measurement and return the results as a dict."""
+    keys = ['key-' + str(i) for i in range(n)]
+    maps = {
+        'sc': lambda: hash_map_sc.HashMap(11, blake2b_64),
+        'oa': lambda: hash_map_oa.HashMap(11, blake2b_64),
+    }
+    results = {
+        'node_bytes': {
+            'dict': bytes_per_object(_DictNode, n),
+            'slots': bytes_per_object(a6_include.SLNode, n),
+        },
+        'entry_bytes': {},
+        'gc_collections': {},
+    }
+    for name, make_map in maps.items():
+        results['entry_bytes'][name] = bytes_per_entry(make_map, keys)
+
+    # churn a working set well under the pool limit so recycling kicks in
+    churn_keys = keys[:a6_include.node_pool.limit // 2]
+    rounds = max(1, n // len(churn_keys))
+    pools = (a6_include.node_pool, a6_include.entry_pool)
+    limits = [pool.limit for pool in pools]
+    for pooled in (True, False):
+        for pool, limit in zip(pools, limits):
+            pool.limit = limit if pooled else 0
+        label = 'pooled' if pooled else 'unpooled'
+        for name, make_map in maps.items():
+            results['gc_collections'][name + '_' + label] = churn_collections(
+                make_map, churn_keys, rounds)
+    for pool, limit in zip(pools, limits):
+        pool.limit = limit
+    return results
+
+
+def main() -> None:
+    """Parse the command line and print the results."""
+    parser = argparse.ArgumentParser(
+        description='Bytes per entry and GC work of the HashMap nodes.')
+    parser.add_argument('-n', type=int, default=100000,
+                        help='number of entries (default 100000)')
+    args = parser.parse_args()
+
+    results = run(args.n)
+    for section, values in results.items():
+        print(section)
+        for name, value in values.items():
+            print('  {:<16} {:>10.1f}'.format(name, value))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,392 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Benchmark harness comparing the SC and OA HashMaps (and
+#              the builtin dict) across workloads, sizes and hash
+#              functions. Results are written as JSON and can be
+#              compared against a stored baseline run.
+#
+# Usage: python benchmark.py [--sizes 1000 10000] [--output out.json]
+#                            [--baseline baseline.json]
+
+
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+
+import hash_map_compact
+import hash_map_oa
+import hash_map_sc
+from a6_include import hash_function_1, hash_function_2
+from bench_memory import bytes_per_entry
+from hash_functions import KeyedHash, SeededHash, blake2b_64, fnv1a_64
+
+MAPS = {
+    'sc': lambda function: hash_map_sc.HashMap(11, function),
+    'oa': lambda function: hash_map_oa.HashMap(11, function),
+    'oa_triangular': lambda function: hash_map_oa.TriangularHashMap(
+        11, function),
+    'oa_robinhood': lambda function: hash_map_oa.RobinHoodHashMap(
+        11, function),
+    'compact': lambda function: hash_map_compact.CompactHashMap(11, function),
+}
+
+HASH_FUNCTIONS = {
+    'hash_function_1': hash_function_1,
+    'hash_function_2': hash_function_2,
+    'blake2b_64': blake2b_64,
+    'fnv1a_64': fnv1a_64,
+    # fixed key and seed so runs stay comparable
+    'keyed': KeyedHash(bytes(16)),
+    'seeded': SeededHash(0),
+}
+
+WORKLOADS = ('uniform', 'zipfian', 'anagram', 'churn')
+
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+# ------------------------------ keys ------------------------------ #
+
+def uniform_keys(rnd: random.Random, n: int) -> list:
+    """Return n distinct random 12 letter keys."""
+    keys = set()
+    while len(keys) < n:
+        keys.add(''.join(rnd.choice(_LETTERS) for _ in range(12)))
+    return sorted(keys)
+
+
+def anagram_keys(rnd: random.Random, n: int) -> list:
+    """
+    Return n distinct keys made of shuffled copies of a few base
+    words, about 100 per word, so hash_function_1 collides heavily.
+    """
+    bases = [''.join(rnd.choice(_LETTERS) for _ in range(10))
+             for _ in range(max(1, n // 100))]
+    keys = set()
+    while len(keys) < n:
+        letters = list(rnd.choice(bases))
+        rnd.shuffle(letters)
+        keys.add(''.join(letters))
+    return sorted(keys)
+
+
+def zipf_sample(rnd: random.Random, keys: list, count: int,
+                s: float = 1.1) -> list:
+    """Return count keys drawn with a Zipf(s) skew towards the front."""
+    weights = [1 / (rank ** s) for rank in range(1, len(keys) + 1)]
+    return rnd.choices(keys, weights=weights, k=count)
+
+
+# ---------------------------- metrics ----------------------------- #
+
+def chain_lengths(hash_map) -> list:
+    """Return the length of every chain of an SC map."""
+    hash_map._finish_migration()
+    return [hash_map._buckets.get_at_index(i).length()
+            for i in range(hash_map.get_capacity())]
+
+
+def probe_lengths(hash_map) -> list:
+    """
+    Return the number of buckets a successful lookup visits for
+    each entry of an OA map.
+    """
+    hash_map._finish_migration()
+    buckets = hash_map._buckets
+    capacity = buckets.length()
+    lengths = []
+    for idx in range(capacity):
+        hash_entry = buckets.get_at_index(idx)
+        if hash_entry is None or hash_entry.is_tombstone:
+            continue
+        if hash_map._step_growth == 0:
+            # linear probing: one probe per bucket from home to here
+            lengths.append((idx - hash_entry.hash) % capacity + 1)
+            continue
+        index, step, probes = hash_entry.hash % capacity, 1, 1
+        while index != idx:
+            index = (index + step) % capacity
+            step += hash_map._step_growth
+            probes += 1
+        lengths.append(probes)
+    return lengths
+
+
+def shape_stats(hash_map) -> dict:
+    """Return mean and max chain or probe length of a map."""
+    if isinstance(hash_map, hash_map_sc.HashMap):
+        lengths = [length for length in chain_lengths(hash_map) if length]
+    elif isinstance(hash_map, hash_map_oa.HashMap):
+        lengths = probe_lengths(hash_map)
+    else:
+        return {}
+    if not lengths:
+        return {'mean_length': 0.0, 'max_length': 0}
+    return {'mean_length': sum(lengths) / len(lengths),
+            'max_length': max(lengths)}
+
+
+def ops_per_second(count: int, seconds: float) -> float:
+    """Return a rate, guarding against a zero duration."""
+    return count / seconds if seconds > 0 else float('inf')
+
+
+def best_of(repeat: int, measure) -> dict:
+    """
+    Call measure repeat times and keep the best value of each metric:
+    the highest rate, the lowest duration. Other values come from the
+    last run.
+    """
+    best = measure()
+    for _ in range(repeat - 1):
+        result = measure()
+        for metric, value in result.items():
+            if metric.endswith('_ops'):
+                best[metric] = max(best[metric], value)
+            elif metric.endswith('_seconds'):
+                best[metric] = min(best[metric], value)
+            else:
+                best[metric] = value
+    return best
+
+
+def timed(function) -> float:
+    """Run function once and return how long it took in seconds."""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+# ---------------------------- workloads --------------------------- #
+
+def run_map(make_map, keys: list, lookups: list, misses: list) -> dict:
+    """
+    Fill a fresh map with keys, look up lookups and misses,
+    resize it, then remove every key. Returns the measurements.
+    """
+    hash_map = make_map()
+    put_seconds = timed(lambda: [hash_map.put(key, key) for key in keys])
+    get_seconds = timed(lambda: [hash_map.get(key) for key in lookups])
+    miss_seconds = timed(lambda: [hash_map.get(key) for key in misses])
+    result = shape_stats(hash_map)
+    resize_seconds = timed(
+        lambda: hash_map.resize_table(2 * hash_map.get_capacity()))
+    remove_seconds = timed(lambda: [hash_map.remove(key) for key in keys])
+
+    result.update({
+        'put_ops': ops_per_second(len(keys), put_seconds),
+        'get_ops': ops_per_second(len(lookups), get_seconds),
+        'miss_ops': ops_per_second(len(misses), miss_seconds),
+        'remove_ops': ops_per_second(len(keys), remove_seconds),
+        'resize_seconds': resize_seconds,
+    })
+    return result
+
+
+def run_dict(keys: list, lookups: list, misses: list) -> dict:
+    """The same measurements as run_map, for the builtin dict."""
+    table = {}
+    put_seconds = timed(lambda: [table.__setitem__(key, key) for key in keys])
+    get_seconds = timed(lambda: [table.get(key) for key in lookups])
+    miss_seconds = timed(lambda: [table.get(key) for key in misses])
+    remove_seconds = timed(lambda: [table.pop(key, None) for key in keys])
+    return {
+        'put_ops': ops_per_second(len(keys), put_seconds),
+        'get_ops': ops_per_second(len(lookups), get_seconds),
+        'miss_ops': ops_per_second(len(misses), miss_seconds),
+        'remove_ops': ops_per_second(len(keys), remove_seconds),
+    }
+
+
+def churn_ops(make_map, keys: list) -> float:
+    """
+    Keep a window of a tenth of the keys live, inserting one key
+    and removing the oldest for every key in turn.
+    Returns operations (puts plus removes) per second.
+    """
+    window = max(1, len(keys) // 10)
+    hash_map = make_map()
+    for key in keys[:window]:
+        hash_map.put(key, key)
+
+    def churn():
+        for i in range(window, len(keys)):
+            hash_map.put(keys[i], keys[i])
+            hash_map.remove(keys[i - window])
+
+    return ops_per_second(2 * (len(keys) - window), timed(churn))
+
+
+def workload_data(name: str, n: int, seed: int) -> tuple:
+    """Return (keys to insert, keys to look up, missing keys)."""
+    rnd = random.Random(seed)
+    if name == 'anagram':
+        keys = anagram_keys(rnd, 2 * n)
+    else:
+        keys = uniform_keys(rnd, 2 * n)
+    rnd.shuffle(keys)
+    keys, misses = keys[:n], keys[n:]
+    if name == 'zipfian':
+        lookups = zipf_sample(rnd, keys, n)
+    else:
+        lookups = list(keys)
+        rnd.shuffle(lookups)
+    return keys, lookups, misses
+
+
+def run(sizes: list, maps: list, hashes: list, workloads: list,
+        seed: int, memory: bool, repeat: int = 3) -> list:
+    """
+    Run every combination and return a list of result dicts.
+    Timings are the best of repeat runs.
+    """
+    results = []
+    for size in sizes:
+        for workload in workloads:
+            keys, lookups, misses = workload_data(workload, size, seed)
+            if workload == 'churn':
+                baseline = best_of(repeat, lambda: {
+                    'churn_ops': churn_ops(dict_map, keys)})
+            else:
+                baseline = best_of(repeat, lambda: run_dict(
+                    keys, lookups, misses))
+            results.append({'map': 'dict', 'hash': 'builtin',
+                            'workload': workload, 'size': size, **baseline})
+
+            for map_name in maps:
+                for hash_name in hashes:
+                    function = HASH_FUNCTIONS[hash_name]
+
+                    def make_map():
+                        return MAPS[map_name](function)
+
+                    if workload == 'churn':
+                        result = best_of(repeat, lambda: {
+                            'churn_ops': churn_ops(make_map, keys)})
+                    else:
+                        result = best_of(repeat, lambda: run_map(
+                            make_map, keys, lookups, misses))
+                        if memory:
+                            result['bytes_per_entry'] = bytes_per_entry(
+                                make_map, keys)
+                    result['vs_dict'] = {
+                        metric: result[metric] / baseline[metric]
+                        for metric in baseline if metric in result}
+                    results.append({'map': map_name, 'hash': hash_name,
+                                    'workload': workload, 'size': size,
+                                    **result})
+                    print('done', map_name, hash_name, workload, size,
+                          file=sys.stderr)
+    return results
+
+
+class _DictMap:
+    """Thin put/remove wrapper so churn_ops can drive a dict."""
+
+    def __init__(self) -> None:
+        """Initialize an empty dict."""
+        self._table = {}
+
+    def put(self, key: str, value: object) -> None:
+        """Set key to value."""
+        self._table[key] = value
+
+    def remove(self, key: str) -> None:
+        """Remove key if present."""
+        self._table.pop(key, None)
+
+
+def dict_map() -> _DictMap:
+    """Return an empty _DictMap."""
+    return _DictMap()
+
+
+# ---------------------------- baseline ---------------------------- #
+
+def compare(results: list, baseline: list, tolerance: float) -> list:
+    """
+    Compare the throughput metrics of results against a baseline run.
+    Returns one dict per matching result with the ratio of each
+    metric (above 1 is faster) and whether any ratio fell below
+    tolerance.
+    """
+    def key_of(result):
+        return (result['map'], result['hash'], result['workload'],
+                result['size'])
+
+    previous = {key_of(result): result for result in baseline}
+    comparisons = []
+    for result in results:
+        old = previous.get(key_of(result))
+        if old is None or result['map'] == 'dict':
+            continue
+        ratios = {metric: result[metric] / old[metric]
+                  for metric in result
+                  if metric.endswith('_ops') and old.get(metric)}
+        comparisons.append({
+            'map': result['map'], 'hash': result['hash'],
+            'workload': result['workload'], 'size': result['size'],
+            'ratios': ratios,
+            'regressed': any(ratio < tolerance for ratio in ratios.values()),
+        })
+    return comparisons
+
+
+def main() -> None:
+    """Parse the command line, run the benchmarks and report."""
+    parser = argparse.ArgumentParser(
+        description='Benchmark the SC and OA HashMaps.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000])
+    parser.add_argument('--maps', nargs='+', default=['sc', 'oa'],
+                        choices=sorted(MAPS))
+    parser.add_argument('--hashes', nargs='+',
+                        default=['hash_function_1', 'hash_function_2',
+                                 'blake2b_64'],
+                        choices=sorted(HASH_FUNCTIONS))
+    parser.add_argument('--workloads', nargs='+', default=list(WORKLOADS),
+                        choices=WORKLOADS)
+    parser.add_argument('--seed', type=int, default=261)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='keep the best of this many runs (default 3)')
+    parser.add_argument('--no-memory', action='store_true',
+                        help='skip the (slow) bytes per entry measurement')
+    parser.add_argument('--output', help='write JSON results here')
+    parser.add_argument('--baseline',
+                        help='JSON results of an earlier run to compare to')
+    parser.add_argument('--tolerance', type=float, default=0.8,
+                        help='flag metrics slower than this share of the '
+                             'baseline (default 0.8)')
+    args = parser.parse_args()
+
+    report = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'seed': args.seed,
+            'repeat': args.repeat,
+        },
+        'results': run(args.sizes, args.maps, args.hashes, args.workloads,
+                       args.seed, not args.no_memory, args.repeat),
+    }
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)['results']
+        report['comparison'] = compare(report['results'], baseline,
+                                       args.tolerance)
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as file:
+            file.write(text + '\n')
+    else:
+        print(text)
+
+    if any(item['regressed'] for item in report.get('comparison', [])):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Self-adjusting bucket lists for the separate chaining
+#              HashMap: move-to-front / transpose on hit, and long
+#              chains kept as sorted arrays
+
+
+from bisect import bisect_left, bisect_right
+
+from a6_include import LinkedList, SLNode, node_pool
+
+# chain orders an AdaptiveList can keep up on a hit
+MOVE_TO_FRONT = 'move_to_front'
+TRANSPOSE = 'transpose'
+CHAIN_ORDERS = (MOVE_TO_FRONT, TRANSPOSE)
+
+
+class SortedChain:
+    """
+    The nodes of a long chain in an array sorted by cached hash, and
+    within one hash by key, so a lookup is a binary search rather
+    than a walk. Keys with equal hashes that can't be compared with
+    < (say an int and a str) switch the array to keeping such nodes
+    in insertion order, searched one by one.
+    Supported methods are: find, insert_node, remove, length, iterator
+    """
+
+    def __init__(self) -> None:
+        """Initialize an empty array."""
+        self._nodes = []
+        self._hashes = []
+        self._keys_ordered = True
+
+    def __iter__(self):
+        """Return an iterator over the nodes, in sorted order."""
+        return iter(self._nodes)
+
+    def length(self) -> int:
+        """Return the number of nodes."""
+        return len(self._nodes)
+
+    def _search(self, key: str, hash: int) -> (int, bool):
+        """
+        Return the index of the node for key, or of where it would
+        go, and whether it was found.
+        """
+        nodes = self._nodes
+        low = bisect_left(self._hashes, hash)
+        high = bisect_right(self._hashes, hash, low)
+        if self._keys_ordered:
+            try:
+                run_high = high
+                while low < high:
+                    middle = (low + high) // 2
+                    if nodes[middle].key < key:
+                        low = middle + 1
+                    else:
+                        high = middle
+                return low, low < run_high and nodes[low].key == key
+            except TypeError:
+                self._keys_ordered = False
+                low = bisect_left(self._hashes, hash)
+                high = bisect_right(self._hashes, hash, low)
+
+        for index in range(low, high):
+            if nodes[index].key == key:
+                return index, True
+        return high, False
+
+    def find(self, key: str, hash: int) -> SLNode:
+        """Return node with matching key, or None if no match"""
+        index, found = self._search(key, hash)
+        return self._nodes[index] if found else None
+
+    def insert_node(self, node: SLNode) -> None:
+        """Add a node whose key is not in the array yet."""
+        index, _ = self._search(node.key, node.hash)
+        node.next = None
+        self._nodes.insert(index, node)
+        self._hashes.insert(index, node.hash)
+
+    def remove(self, key: str, hash: int) -> SLNode:
+        """Remove and return the node for key, or None if no match."""
+        index, found = self._search(key, hash)
+        if not found:
+            return None
+        del self._hashes[index]
+        return self._nodes.pop(index)
+
+
+class AdaptiveList(LinkedList):
+    """
+    LinkedList bucket that adjusts itself to the lookups it serves.
+    With an order, a node found by contains() moves to the front of
+    the list (MOVE_TO_FRONT) or one step closer to it (TRANSPOSE), so
+    hot keys end up near the head.
+    With a threshold, a list that grows past threshold nodes turns
+    into a SortedChain, bounding lookups by O(log n) even when keys
+    are picked to collide, and turns back into a list once removals
+    bring it down to half the threshold.
+    Nodes are never copied, so callers may hold on to them.
+    """
+
+    def __init__(self, order: str = None, threshold: int = None) -> None:
+        """Initialize new list with the given order and threshold."""
+        super().__init__()
+        self._order = order
+        self._threshold = threshold
+        self._sorted = None
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        if self._sorted is None:
+            return super().__str__()
+        return 'SLL [' + ' -> '.join(str(node) for node in self._sorted) + ']'
+
+    def __iter__(self):
+        """Return an iterator over the nodes of the list."""
+        if self._sorted is None:
+            return super().__iter__()
+        return iter(self._sorted)
+
+    def insert(self, key: str, value: object, hash: int = None) -> SLNode:
+        """Insert new node and return it."""
+        if self._sorted is None:
+            node = super().insert(key, value, hash)
+            self._treeify_if_long()
+            return node
+
+        node = node_pool.acquire()
+        if node is None:
+            node = SLNode(key, value, None, hash)
+        else:
+            node.key, node.value, node.hash = key, value, hash
+        self.insert_node(node)
+        return node
+
+    def insert_node(self, node: SLNode) -> None:
+        """Link an existing node in."""
+        if self._sorted is None:
+            super().insert_node(node)
+            self._treeify_if_long()
+            return
+
+        self._sorted.insert_node(node)
+        self._size += 1
+
+    def remove(self, key: str, hash: int = None, recycle: bool = True) -> bool:
+        """
+        Remove node with matching key.
+        Return True if removal was successful, False otherwise.
+        """
+        if self._sorted is None or hash is None:
+            if self._sorted is not None:
+                self._untreeify()
+            return super().remove(key, hash, recycle)
+
+        node = self._sorted.remove(key, hash)
+        if node is None:
+            return False
+        self._size -= 1
+        if recycle:
+            node_pool.release(node)
+        if self._size <= self._threshold // 2:
+            self._untreeify()
+        return True
+
+    def contains(self, key: str, hash: int = None) -> SLNode:
+        """
+        Return node with matching key, or None if no match
+        A match is moved towards the front as the order says.
+        """
+        if self._sorted is not None and hash is not None:
+            return self._sorted.find(key, hash)
+        if self._sorted is not None:
+            self._untreeify()
+
+        before_previous, previous, node = None, None, self._head
+        while node:
+            if (hash is None or node.hash == hash) and node.key == key:
+                if previous is not None and self._order is not None:
+                    previous.next = node.next
+                    if self._order == MOVE_TO_FRONT:
+                        node.next = self._head
+                        self._head = node
+                    else:
+                        # swap the match with the node just before it
+                        node.next = previous
+                        if before_previous is None:
+                            self._head = node
+                        else:
+                            before_previous.next = node
+                return node
+            before_previous, previous, node = previous, node, node.next
+        return None
+
+    def _treeify_if_long(self) -> None:
+        """Turn the list into a SortedChain once it passes the threshold."""
+        if self._threshold is None or self._size <= self._threshold:
+            return
+
+        sorted_chain = SortedChain()
+        node = self._head
+        while node:
+            next_node = node.next
+            sorted_chain.insert_node(node)
+            node = next_node
+        self._sorted = sorted_chain
+        self._head = None
+
+    def _untreeify(self) -> None:
+        """Turn the SortedChain back into a linked list."""
+        head = None
+        for node in reversed(list(self._sorted)):
+            node.next = head
+            head = node
+        self._head = head
+        self._sorted = None
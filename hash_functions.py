@@ -0,0 +1,222 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Hash functions that can be passed to either HashMap
+#              in place of hash_function_1 / hash_function_2.
+
+
+import math
+import os
+from hashlib import blake2b
+
+from primes import next_prime
+
+_MASK_64 = (1 << 64) - 1
+_FNV_OFFSET_64 = 0xcbf29ce484222325
+_FNV_PRIME_64 = 0x100000001b3
+
+
+def _key_bytes(key) -> bytes:
+    """Encode a key as bytes so every function hashes the same input."""
+    if isinstance(key, bytes):
+        return key
+    return str(key).encode('utf-8', 'surrogatepass')
+
+
+def blake2b_64(key: str) -> int:
+    """
+    64 bit BLAKE2b digest of the UTF-8 bytes of the key.
+    Deterministic across runs and well spread, and the byte loop
+    runs in C, so it is the stable function to use by default.
+    Use SeededHash when hashes never leave the process, and
+    KeyedHash when keys come from untrusted input.
+    """
+    return int.from_bytes(blake2b(_key_bytes(key), digest_size=8).digest(),
+                          'little')
+
+
+def fnv1a_64(key: str) -> int:
+    """
+    64 bit FNV-1a over the UTF-8 bytes of the key.
+    Deterministic across runs and order sensitive, and simple enough
+    to reproduce in any language, but the byte loop runs in Python:
+    it is slower than hash_function_1, so prefer blake2b_64 unless
+    the exact FNV-1a values are needed.
+    """
+    hash = _FNV_OFFSET_64
+    for byte in _key_bytes(key):
+        hash = ((hash ^ byte) * _FNV_PRIME_64) & _MASK_64
+    return hash
+
+
+class KeyedHash:
+    """
+    Keyed 64 bit hash for keys that come from untrusted input.
+    Plays the role SipHash plays for the builtin dict: without the
+    secret key an attacker can't build a set of colliding keys.
+    Uses keyed BLAKE2b from hashlib so the byte loop runs in C.
+    """
+
+    # same key, same hash in every process
+    stable = True
+
+    def __init__(self, key: bytes = None) -> None:
+        """Initialize with a 16 byte key; a random one if none is given."""
+        self.key = key if key is not None else os.urandom(16)
+
+    def __call__(self, key: str) -> int:
+        """Return the hash of key."""
+        digest = blake2b(_key_bytes(key), digest_size=8, key=self.key).digest()
+        return int.from_bytes(digest, 'little')
+
+    def __repr__(self) -> str:
+        """Override repr method to provide more readable output."""
+        return 'KeyedHash(' + self.key.hex() + ')'
+
+
+class SeededHash:
+    """
+    Builtin hash() mixed with a per-map random seed.
+    The fastest choice since all the work happens in C, but str
+    hashes change between interpreter runs unless PYTHONHASHSEED
+    is fixed, so these hashes must not be stored or shipped to
+    another process.
+    """
+
+    stable = False
+
+    def __init__(self, seed: int = None) -> None:
+        """Initialize with a seed; a random one if none is given."""
+        self.seed = seed if seed is not None else int.from_bytes(
+            os.urandom(8), 'little')
+
+    def __call__(self, key: str) -> int:
+        """Return the hash of key."""
+        return hash((self.seed, key))
+
+    def __repr__(self) -> str:
+        """Override repr method to provide more readable output."""
+        return 'SeededHash(' + str(self.seed) + ')'
+
+
+def is_stable(function) -> bool:
+    """
+    Return True if function hashes a key the same way in every
+    process, so its hashes may be stored or computed elsewhere.
+    Classes say so with a stable attribute; plain functions such as
+    blake2b_64 are assumed stable, except the builtin hash itself.
+    """
+    return getattr(function, 'stable', function is not hash)
+
+
+def _probe_lengths(hashes: list, capacity: int) -> list:
+    """
+    Insert hashes into a quadratic probing table of capacity, as the
+    open addressing HashMap would, and return the probes each took.
+    """
+    taken = [False] * capacity
+    lengths = []
+    for hash in hashes:
+        index = hash % capacity
+        step = 1
+        probes = 1
+        while taken[index]:
+            index = (index + step) % capacity
+            step += 2
+            probes += 1
+        taken[index] = True
+        lengths.append(probes)
+    return lengths
+
+
+def collision_report(function, keys, capacity: int = None,
+                     pairs: int = 5) -> dict:
+    """
+    Receives a hash function, an iterable of distinct keys and a
+    chaining table capacity (the prime at or above the key count by
+    default).
+    Returns a dict describing how well the function spreads the keys:
+      keys             number of keys hashed
+      capacity         chaining table capacity used
+      hash_collisions  keys whose full hash code was already taken
+      collision_pairs  up to pairs (key, key) examples of such keys
+      empty_buckets    buckets no key maps to
+      occupancy        chain length -> number of buckets that long
+      max_bucket       most keys mapped to a single bucket
+      chi_square       chi-square statistic of the bucket counts
+                       against a uniform spread; close to capacity
+                       for a good function
+      chi_square_z     the same as a z-score: near 0 for a uniform
+                       spread, large and positive for clustering
+      max_probe        longest probe inserting the keys into an open
+                       addressing table at load 0.5
+      mean_probe       mean probe length there
+    """
+    keys = list(keys)
+    n = len(keys)
+    if capacity is None:
+        capacity = next_prime(max(n, 1))
+
+    hashes = [function(key) for key in keys]
+    counts = [0] * capacity
+    first_key = {}
+    collisions = 0
+    collision_pairs = []
+    for key, hash in zip(keys, hashes):
+        counts[hash % capacity] += 1
+        if hash in first_key:
+            collisions += 1
+            if len(collision_pairs) < pairs:
+                collision_pairs.append((first_key[hash], key))
+        else:
+            first_key[hash] = key
+
+    occupancy = {}
+    for count in counts:
+        occupancy[count] = occupancy.get(count, 0) + 1
+
+    expected = n / capacity
+    chi_square = 0.0
+    if expected:
+        chi_square = sum((count - expected) ** 2 for count in counts) / expected
+    # chi-square with capacity - 1 degrees of freedom is close to
+    # normal with that mean and twice that variance
+    freedom = max(capacity - 1, 1)
+    chi_square_z = (chi_square - freedom) / math.sqrt(2 * freedom)
+
+    probes = _probe_lengths(hashes, next_prime(2 * n + 1))
+    return {
+        'keys': n,
+        'capacity': capacity,
+        'hash_collisions': collisions,
+        'collision_pairs': collision_pairs,
+        'empty_buckets': occupancy.get(0, 0),
+        'occupancy': dict(sorted(occupancy.items())),
+        'max_bucket': max(counts),
+        'chi_square': chi_square,
+        'chi_square_z': chi_square_z,
+        'max_probe': max(probes, default=0),
+        'mean_probe': sum(probes) / n if n else 0.0,
+    }
+
+
+def compare_functions(keys, capacity: int = None, functions: dict = None,
+                      pairs: int = 5) -> dict:
+    """
+    Receives keys, a table capacity and a dict of name -> hash function
+    (every function in this module plus the a6_include ones by default).
+    Returns a dict of name -> collision_report for each function.
+    Duplicate keys are dropped first.
+    """
+    if functions is None:
+        from a6_include import hash_function_1, hash_function_2
+        functions = {
+            'hash_function_1': hash_function_1,
+            'hash_function_2': hash_function_2,
+            'blake2b_64': blake2b_64,
+            'fnv1a_64': fnv1a_64,
+            'keyed': KeyedHash(),
+            'seeded': SeededHash(),
+        }
+    keys = list(dict.fromkeys(keys))
+    return {name: collision_report(function, keys, capacity, pairs)
+            for name, function in functions.items()}
@@ -0,0 +1,406 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Bounded LRU cache with optional expiry, built on the
+#              separate chaining hash map
+
+
+import sys
+import time
+
+from a6_include import DynamicArray, SLNode, hash_function_1
+from hash_map_sc import HashMap
+from primes import grow_prime
+
+
+class CacheNode(SLNode):
+    """
+    Chain node that is also a link of the cache's recency list.
+    prev_used / next_used point to the entries used just before and
+    just after this one; expires is the clock time the entry stops
+    being valid (None for never) and nbytes its estimated size.
+    """
+
+    __slots__ = ('prev_used', 'next_used', 'expires', 'nbytes')
+
+    def __init__(self, key: str, value: object, hash: int = None) -> None:
+        """Initialize a node that is not yet in the recency list."""
+        super().__init__(key, value, None, hash)
+        self.prev_used = self.next_used = self
+        self.expires = None
+        self.nbytes = 0
+
+
+# estimated bytes of a CacheNode itself, on top of its key and value
+_NODE_BYTES = sys.getsizeof(CacheNode(None, None))
+
+
+class LRUCache(HashMap):
+    """
+    Separate chaining HashMap that evicts its least recently used
+    entries once it holds more than max_entries entries or more than
+    max_bytes estimated bytes. Entries may also expire ttl seconds
+    after they are put; an expired entry is dropped the next time it
+    is looked up, or by expire(). The entry just put is never the one
+    evicted, so an entry larger than max_bytes on its own stays until
+    the next put.
+    Chains hold CacheNodes, which also form a doubly linked recency
+    list, so promoting a hit and finding the entry to evict are O(1).
+    A get() hit counts as a use; contains_key() does not.
+    """
+
+    def __init__(self,
+                 max_entries: int = None,
+                 max_bytes: int = None,
+                 ttl: float = None,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 sizeof: callable = sys.getsizeof,
+                 clock: callable = time.monotonic) -> None:
+        """
+        Initialize new LRUCache.
+        Either limit may be None for no limit. ttl is the default
+        lifetime of an entry in seconds, None for no expiry. sizeof
+        estimates the bytes of a key or value and clock tells the
+        time; both can be swapped out, e.g. for tests.
+        """
+        super().__init__(capacity, function, max_load)
+        self._max_entries = max_entries
+        self._max_bytes = max_bytes
+        self._ttl = ttl
+        self._sizeof = sizeof
+        self._clock = clock
+        self._bytes = 0
+
+        # sentinel of the circular recency list: its next_used is the
+        # least recently used entry and its prev_used the most recent
+        self._used = CacheNode(None, None)
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._expirations = 0
+
+    # ------------------------------------------------------------------ #
+
+    def _link_used(self, node: CacheNode) -> None:
+        """Make node the most recently used entry."""
+        last = self._used.prev_used
+        node.prev_used, node.next_used = last, self._used
+        last.next_used = node
+        self._used.prev_used = node
+
+    def _unlink_used(self, node: CacheNode) -> None:
+        """Take node out of the recency list."""
+        node.prev_used.next_used = node.next_used
+        node.next_used.prev_used = node.prev_used
+        node.prev_used = node.next_used = node
+
+    def _touch(self, node: CacheNode) -> None:
+        """Move node to the most recently used end."""
+        self._unlink_used(node)
+        self._link_used(node)
+
+    def _expired(self, node: CacheNode) -> bool:
+        """Return True if node's lifetime is over."""
+        return node.expires is not None and node.expires <= self._clock()
+
+    def _set(self, node: CacheNode, value: object, ttl: float) -> None:
+        """Store value in node and restart its lifetime."""
+        self._bytes -= node.nbytes
+        node.value = value
+        node.nbytes = _NODE_BYTES + self._sizeof(node.key) + self._sizeof(value)
+        self._bytes += node.nbytes
+        if ttl is None:
+            ttl = self._ttl
+        node.expires = None if ttl is None else self._clock() + ttl
+
+    def _drop(self, node: CacheNode) -> None:
+        """Remove node from its chain and from the recency list."""
+        if self._snapshots is not None:
+            self._preserve(node.hash)
+        linked_list = self._bucket(node.hash)
+        linked_list.remove(node.key, node.hash)
+        if linked_list.length() == 0:
+            self._nonempty -= 1
+        self._unlink_used(node)
+        self._bytes -= node.nbytes
+        self._size -= 1
+        self._mod_count += 1
+
+    def _over_limit(self) -> bool:
+        """Return True if the cache holds more than either limit allows."""
+        return ((self._max_entries is not None
+                 and self._size > self._max_entries) or
+                (self._max_bytes is not None
+                 and self._bytes > self._max_bytes))
+
+    def _evict(self, keep: CacheNode) -> None:
+        """
+        Drop least recently used entries until both limits are met,
+        but never keep, the entry just put, which the caller returns.
+        """
+        while self._size and self._over_limit():
+            node = self._used.next_used
+            if node is keep:
+                # keep is the most recently used, so it is the last one
+                break
+            self._drop(node)
+            self._evictions += 1
+
+    def _lookup(self, key: str) -> CacheNode:
+        """
+        Return the live node for key, or None if it is missing.
+        An expired node is dropped and reported as missing.
+        """
+        self._migrate_step()
+        hash = self._hash_function(key)
+        node = self._bucket(hash).contains(key, hash)
+        if node is not None and self._expired(node):
+            self._drop(node)
+            self._expirations += 1
+            return None
+        return node
+
+    def _put_hashed(self, key: str, value: object, hash: int,
+                    ttl: float = None, overwrite: bool = True) -> CacheNode:
+        """
+        Insert or update key, whose hash is already known, as its
+        most recently used entry. An expired entry counts as missing.
+        If the key exists and overwrite is False its value is kept.
+        Evicts other entries over the limits, then grows the table if
+        needed. Returns the key's node, which is never evicted here.
+        """
+        if self._snapshots is not None:
+            self._preserve(hash)
+        linked_list = self._bucket(hash)
+        node = linked_list.contains(key, hash)
+        if node is not None and self._expired(node):
+            self._drop(node)
+            self._expirations += 1
+            node = None
+
+        if node is not None:
+            self._touch(node)
+            if overwrite:
+                self._set(node, value, ttl)
+                self._evict(node)
+            return node
+
+        node = CacheNode(key, None, hash)
+        self._set(node, value, ttl)
+        linked_list.insert_node(node)
+        if linked_list.length() == 1:
+            self._nonempty += 1
+        self._link_used(node)
+        self._size += 1
+        self._mod_count += 1
+
+        self._evict(node)
+        if self.table_load() > self._max_load:
+            self._resize(grow_prime(self.get_capacity()))
+        return node
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object, ttl: float = None) -> None:
+        """
+        Updates key/value pairs in the cache and marks the key as
+        most recently used.
+        ttl overrides the cache's default lifetime for this entry.
+        Evicts least recently used entries if a limit is exceeded.
+        """
+        self._migrate_step()
+        self._put_hashed(key, value, self._hash_function(key), ttl)
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key.
+        Returns the value associated with the key and marks the key
+        as most recently used.
+        If the key is not in the cache or has expired, return None.
+        """
+        node = self._lookup(key)
+        if node is None:
+            self._misses += 1
+            return None
+        self._hits += 1
+        self._touch(node)
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key.
+        Returns true if the key is in the cache and has not expired.
+        Does not count as a use of the key.
+        """
+        return self._lookup(key) is not None
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key.
+        Remove that key and the corresponding value from the cache.
+        Does nothing if it doesn't find the key.
+        """
+        node = self._lookup(key)
+        if node is not None:
+            self._drop(node)
+            self._shrink_if_sparse()
+
+    def expire(self) -> int:
+        """
+        Drop every expired entry.
+        Returns the number of entries dropped.
+        """
+        now = self._clock()
+        expired = 0
+        node = self._used.next_used
+        while node is not self._used:
+            next_node = node.next_used
+            if node.expires is not None and node.expires <= now:
+                self._drop(node)
+                expired += 1
+            node = next_node
+
+        self._expirations += expired
+        if expired:
+            self._shrink_if_sparse()
+        return expired
+
+    def clear(self) -> None:
+        """
+        Clear the content of the cache. Counters are kept.
+        """
+        super().clear()
+        self._bytes = 0
+        self._used = CacheNode(None, None)
+
+    def _upsert(self, key: str, default: object) -> CacheNode:
+        """
+        Return the node for key, adding it with value default first
+        if it is missing, and mark it as most recently used.
+        """
+        self._migrate_step()
+        return self._put_hashed(key, default, self._hash_function(key),
+                                overwrite=False)
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable (or DynamicArray) of (key, value) tuples.
+        Puts every pair, as put() would one by one.
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Returns a dynamic array with the value of each key, in the
+        same order, holding None for keys that are not found.
+        """
+        values_da = DynamicArray()
+        for key in keys:
+            values_da.append(self.get(key))
+        return values_da
+
+    def remove_many(self, keys) -> int:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Removes each key that is found.
+        Returns the number of keys removed.
+        """
+        removed = 0
+        for key in keys:
+            node = self._lookup(key)
+            if node is not None:
+                self._drop(node)
+                removed += 1
+        if removed:
+            self._shrink_if_sparse()
+        return removed
+
+    def items(self):
+        """
+        Yield each (key, value) pair that has not expired, from least
+        to most recently used. Does not count as a use of the keys.
+        Raises RuntimeError if the cache changes while the iteration
+        is running.
+        """
+        expected = self._mod_count
+        now = self._clock()
+        node = self._used.next_used
+        while node is not self._used:
+            if node.expires is None or node.expires > now:
+                yield node.key, node.value
+                if self._mod_count != expected:
+                    raise RuntimeError('HashMap changed size during iteration')
+            node = node.next_used
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing a tuple of (key, value)
+        for each entry that has not expired, least recently used first.
+        """
+        tuple_array = DynamicArray()
+        for pair in self.items():
+            tuple_array.append(pair)
+        return tuple_array
+
+    def get_bytes(self) -> int:
+        """Return the estimated bytes held by the cache's entries."""
+        return self._bytes
+
+    def stats(self) -> dict:
+        """
+        Returns the map statistics of HashMap.stats() plus the cache's
+        hit, miss, eviction and expiry counts and estimated bytes.
+        """
+        snapshot = super().stats()
+        lookups = self._hits + self._misses
+        snapshot.update({
+            'bytes': self._bytes,
+            'hits': self._hits,
+            'misses': self._misses,
+            'hit_rate': self._hits / lookups if lookups else 0.0,
+            'evictions': self._evictions,
+            'expirations': self._expirations,
+        })
+        return snapshot
+
+    # ------------------------------------------------------------------ #
+
+    def _options(self) -> dict:
+        """Return the constructor arguments save() keeps with the cache."""
+        return {
+            'max_entries': self._max_entries,
+            'max_bytes': self._max_bytes,
+            'ttl': self._ttl,
+            'max_load': self._max_load,
+        }
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "LRUCache":
+        """
+        Return a new cache holding the entries saved at path.
+        Recency and expiry times are not saved: entries come back in
+        bucket order, each with a fresh lifetime, and are placed by
+        their saved hashes. kwargs override the saved limits.
+        """
+        saved = _SavedCache.load(path)
+        options = dict(saved.options)
+        options.update(kwargs)
+        cache = cls(capacity=saved.get_capacity(),
+                    function=saved._hash_function, **options)
+        for idx in range(saved.get_capacity()):
+            for node in saved._buckets.get_at_index(idx):
+                cache._put_hashed(node.key, node.value, node.hash)
+        return cache
+
+
+class _SavedCache(HashMap):
+    """Plain chaining map that a saved cache is first read into."""
+
+    def __init__(self, capacity: int, function, **options) -> None:
+        """Keep the saved cache options for LRUCache.load()."""
+        super().__init__(capacity, function)
+        self.options = options
@@ -0,0 +1,246 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Open addressing hash map stored in parallel flat arrays
+
+
+from array import array
+
+from a6_include import DynamicArray
+from hash_map_oa import HashMap
+from primes import grow_prime
+
+# slot states kept one byte per bucket in a bytearray
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# cached hash codes are folded into a signed 64 bit array slot
+_HASH_MASK = (1 << 63) - 1
+
+
+class CompactHashMap:
+    """
+    Open addressing hash map with quadratic probing that keeps its
+    buckets in parallel arrays instead of one HashEntry per key:
+    cached hash codes in an array('q'), keys and values in two lists
+    and slot states in a bytearray.
+    Probing compares cached hash codes before keys.
+    Supported methods are: put, get, contains_key, remove, clear,
+    resize_table, table_load, empty_buckets, get_size, get_capacity,
+    get_keys_and_values. The iterators, batch and counting methods,
+    stats and snapshots of hash_map_oa.HashMap are not provided.
+    """
+
+    _is_prime = staticmethod(HashMap._is_prime)
+    _next_prime = HashMap._next_prime
+
+    def __init__(self, capacity: int, function,
+                 max_occupancy: float = 0.5) -> None:
+        """
+        Initialize new CompactHashMap.
+        max_occupancy bounds the share of buckets holding live entries
+        or tombstones, as in hash_map_oa.HashMap.
+        """
+        self._capacity = self._next_prime(capacity)
+        self._hash_function = function
+        self._max_occupancy = max_occupancy
+        self._allocate()
+
+    def _allocate(self) -> None:
+        """Allocate empty bucket arrays for the current capacity."""
+        self._hashes = array('q', bytes(8 * self._capacity))
+        self._keys = [None] * self._capacity
+        self._values = [None] * self._capacity
+        self._states = bytearray(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == EMPTY:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) +
+                        ' V: ' + str(self._values[i]) +
+                        ' TS: ' + str(self._states[i] == TOMBSTONE) + '\n')
+        return out
+
+    def get_size(self) -> int:
+        """Return size of map."""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map."""
+        return self._capacity
+
+    # ------------------------------------------------------------------ #
+
+    def _hash(self, key: str) -> int:
+        """Return the cached form of the hash code for key."""
+        return self._hash_function(key) & _HASH_MASK
+
+    def _find_index(self, key: str, hash: int) -> int:
+        """
+        Quadratic probe for a live slot holding key.
+        Return its index, or -1 if the key is not found.
+        """
+        capacity = self._capacity
+        hashes, keys, states = self._hashes, self._keys, self._states
+        index = hash % capacity
+        step = 1
+        state = states[index]
+        while state != EMPTY:
+            if (state == LIVE and hashes[index] == hash
+                    and keys[index] == key):
+                return index
+            # (j + 1) ** 2 - j ** 2 == 2j + 1, so no power per step
+            index = (index + step) % capacity
+            step += 2
+            state = states[index]
+        return -1
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update a key/value pair in the hash map.
+        For existing key, update value.
+        For new key, add key/value pair, reusing the first tombstone
+        on its probe path.
+        """
+        capacity = self._capacity
+        # count the bucket this put may take, so the table never goes
+        # past max_occupancy and probing always finds an empty bucket
+        occupied = self._size + self._tombstones + 1
+        if occupied / capacity > self._max_occupancy:
+            if self.table_load() >= self._max_occupancy / 2:
+                self.resize_table(grow_prime(capacity))
+            else:
+                self.resize_table(capacity)
+            capacity = self._capacity
+
+        hash = self._hash(key)
+        hashes, keys, states = self._hashes, self._keys, self._states
+        index = hash % capacity
+        tombstone_index = -1
+        step = 1
+        state = states[index]
+        while state != EMPTY:
+            if state == TOMBSTONE:
+                if tombstone_index == -1:
+                    tombstone_index = index
+            elif hashes[index] == hash and keys[index] == key:
+                self._values[index] = value
+                return
+            index = (index + step) % capacity
+            step += 2
+            state = states[index]
+
+        if tombstone_index != -1:
+            index = tombstone_index
+            self._tombstones -= 1
+        hashes[index] = hash
+        keys[index] = key
+        self._values[index] = value
+        states[index] = LIVE
+        self._size += 1
+
+    def table_load(self) -> float:
+        """Returns the hash table load factor."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty buckets in the hash table."""
+        return self._capacity - self._size
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the hash table.
+        The capacity keeps growing until every live slot fits under
+        max_occupancy. Live slots are moved using their cached hash
+        codes; tombstones are dropped.
+        """
+        if new_capacity < self._size:
+            return
+        old_hashes, old_keys = self._hashes, self._keys
+        old_values, old_states = self._values, self._states
+
+        capacity = self._next_prime(new_capacity)
+        while self._size / capacity > self._max_occupancy:
+            capacity = grow_prime(capacity)
+        self._capacity = capacity
+        self._allocate()
+
+        hashes, keys, states = self._hashes, self._keys, self._states
+        values = self._values
+        moved = 0
+        for old_index in range(len(old_states)):
+            if old_states[old_index] != LIVE:
+                continue
+            hash = old_hashes[old_index]
+            index = hash % capacity
+            step = 1
+            while states[index] != EMPTY:
+                index = (index + step) % capacity
+                step += 2
+            hashes[index] = hash
+            keys[index] = old_keys[old_index]
+            values[index] = old_values[old_index]
+            states[index] = LIVE
+            moved += 1
+        self._size = moved
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value corresponding with the given key.
+        Return none if the key is not found.
+        """
+        if self._size == 0:
+            return None
+        index = self._find_index(key, self._hash(key))
+        if index == -1:
+            return None
+        return self._values[index]
+
+    def contains_key(self, key: str) -> bool:
+        """Returns true if the given key is in the hash map."""
+        if self._size == 0:
+            return False
+        return self._find_index(key, self._hash(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key/value pair corresponding with the given key.
+        The slot becomes a tombstone; the key and value references
+        are dropped right away.
+        If key is not found, does nothing.
+        """
+        if self._size == 0:
+            return
+        index = self._find_index(key, self._hash(key))
+        if index == -1:
+            return
+        self._states[index] = TOMBSTONE
+        self._keys[index] = None
+        self._values[index] = None
+        self._size -= 1
+        self._tombstones += 1
+
+    def clear(self) -> None:
+        """
+        Clear the content of the hash map.
+        Does not change the hash table capacity.
+        """
+        self._allocate()
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of tuples (key, value)
+        stored in the hash map
+        """
+        tuples_da = DynamicArray()
+        keys, values, states = self._keys, self._values, self._states
+        for index in range(self._capacity):
+            if states[index] == LIVE:
+                tuples_da.append((keys[index], values[index]))
+        return tuples_da
@@ -0,0 +1,493 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Thread-safe separate chaining hash map with striped locks
+
+
+import threading
+from time import perf_counter
+
+from a6_include import DynamicArray, LinkedList, SLNode, hash_function_1
+from hash_map_sc import HashMap
+from primes import grow_prime
+from snapshot import ChainSnapshot
+
+
+class ConcurrentHashMap(HashMap):
+    """
+    Separate chaining HashMap that can be shared between threads.
+    Buckets are split into stripes, each guarded by its own lock, so
+    writers to different stripes don't wait for each other. Reads
+    take no lock: removed nodes are never recycled and a resize
+    copies the chains into a new bucket array before swapping it in,
+    so a reader always walks an intact chain of either the old or the
+    new array.
+    put_if_absent(), compute(), setdefault(), increment() and
+    update_with() are atomic. Iteration walks the bucket array as it
+    was when it started and doesn't raise if the map changes.
+    The table only grows; incremental resizing is not supported.
+    """
+
+    def __init__(self,
+                 capacity: int = 11,
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 stripes: int = 16) -> None:
+        """
+        Initialize new ConcurrentHashMap with stripes locks.
+        More stripes let more writers run at once, up to one per bucket.
+        """
+        super().__init__(capacity, function, max_load, min_load=0)
+        self._stripes = stripes
+        self._locks = [threading.Lock() for _ in range(stripes)]
+
+        # sizes and non-empty chain counts are kept per stripe, so
+        # each is only written under that stripe's lock
+        self._sizes = [0] * stripes
+        self._filled = [0] * stripes
+
+        # up while set_hash_function() runs: the new function is in
+        # use before the new bucket array is swapped in
+        self._switching = False
+
+    def get_size(self) -> int:
+        """
+        Return size of map
+        Exact when no writer is running, a close estimate otherwise.
+        """
+        return sum(self._sizes)
+
+    # ------------------------------------------------------------------ #
+
+    def _lock_bucket(self, key: str) -> (DynamicArray, int, int,
+                                         threading.Lock):
+        """
+        Acquire the lock of the stripe key belongs to. Return the
+        bucket array, the key's hash, its index in the array and the
+        acquired lock, which the caller must release.
+        If a resize or set_hash_function() swapped the bucket array
+        while this thread waited, the key is hashed again and the
+        lock of its stripe in the new array is taken instead.
+        """
+        while True:
+            # set_hash_function() swaps in the new function before
+            # the new array, so the hash matches the array read here
+            buckets = self._buckets
+            hash = self._hash_function(key)
+            index = hash % buckets.length()
+            lock = self._locks[index % self._stripes]
+            lock.acquire()
+            if buckets is self._buckets:
+                return buckets, hash, index, lock
+            lock.release()
+
+    def _lock_all(self) -> None:
+        """Acquire every stripe lock, always in the same order."""
+        for lock in self._locks:
+            lock.acquire()
+
+    def _unlock_all(self) -> None:
+        """Release every stripe lock."""
+        for lock in self._locks:
+            lock.release()
+
+    def _insert(self, linked_list: LinkedList, index: int, key: str,
+                value: object, hash: int) -> None:
+        """Add a new key to a chain whose stripe lock is held."""
+        linked_list.insert(key, value, hash)
+        stripe = index % self._stripes
+        self._sizes[stripe] += 1
+        if linked_list.length() == 1:
+            self._filled[stripe] += 1
+
+    def _unlink(self, linked_list: LinkedList, index: int, key: str,
+                hash: int) -> bool:
+        """
+        Remove key from a chain whose stripe lock is held.
+        The node is not recycled, so readers still walking past it
+        reach the rest of the chain.
+        """
+        if not linked_list.remove(key, hash, recycle=False):
+            return False
+        stripe = index % self._stripes
+        self._sizes[stripe] -= 1
+        if linked_list.length() == 0:
+            self._filled[stripe] -= 1
+        return True
+
+    def _grow_if_full(self) -> None:
+        """Double the table once the load factor goes above max_load."""
+        if self.table_load() <= self._max_load:
+            return
+
+        self._lock_all()
+        try:
+            # another writer may have grown the table in the meantime
+            if self.table_load() > self._max_load:
+                self._rehash(grow_prime(self.get_capacity()))
+        finally:
+            self._unlock_all()
+
+    def _rehash(self, new_capacity: int, function=None) -> None:
+        """
+        Copy every node into a new bucket array of new_capacity and
+        swap it in. The caller holds every stripe lock.
+        Nodes are copied rather than relinked, so readers still
+        walking the old array are not affected. Given a function,
+        the copies are hashed with it instead of keeping their hash.
+        """
+        if self._stats is not None:
+            start = perf_counter()
+        old_da = self._buckets
+        buckets = DynamicArray([LinkedList() for _ in range(new_capacity)])
+        sizes = [0] * self._stripes
+        filled = [0] * self._stripes
+
+        for idx in range(old_da.length()):
+            for node in old_da.get_at_index(idx):
+                hash = node.hash if function is None else function(node.key)
+                index = hash % new_capacity
+                linked_list = buckets.get_at_index(index)
+                linked_list.insert(node.key, node.value, hash)
+                sizes[index % self._stripes] += 1
+                if linked_list.length() == 1:
+                    filled[index % self._stripes] += 1
+
+        self._sizes, self._filled = sizes, filled
+        self._capacity = new_capacity
+        self._mod_count += 1
+        # readers pick up the new array from here on, and snapshots
+        # keep the old one to themselves
+        self._buckets = buckets
+        self._snapshots = None
+
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Updates key/value pairs in the hash map.
+        If key exists, replace its value with the new value.
+        If key does not exist, add the new key/value pair.
+        """
+        buckets, hash, index, lock = self._lock_bucket(key)
+        try:
+            if self._snapshots is not None:
+                self._preserve(hash)
+            linked_list = buckets.get_at_index(index)
+            node = linked_list.contains(key, hash)
+            if node is not None:
+                node.value = value
+                return
+            self._insert(linked_list, index, key, value, hash)
+        finally:
+            lock.release()
+        self._grow_if_full()
+
+    def put_if_absent(self, key: str, value: object) -> object:
+        """
+        Receives a key and a value.
+        Adds the pair only if the key is missing.
+        Returns the value already stored for the key, or None if
+        the pair was added.
+        """
+        added, value = self._put_if_absent(key, value)
+        return None if added else value
+
+    def _put_if_absent(self, key: str, value: object) -> (bool, object):
+        """
+        Add the pair only if the key is missing.
+        Return (True, value) if it was added, and (False, the value
+        already stored) otherwise, which may itself be None.
+        """
+        buckets, hash, index, lock = self._lock_bucket(key)
+        try:
+            linked_list = buckets.get_at_index(index)
+            node = linked_list.contains(key, hash)
+            if node is not None:
+                return False, node.value
+            if self._snapshots is not None:
+                self._preserve(hash)
+            self._insert(linked_list, index, key, value, hash)
+        finally:
+            lock.release()
+        self._grow_if_full()
+        return True, value
+
+    def compute(self, key: str, function) -> object:
+        """
+        Receives a key and a function of one argument.
+        Replaces the key's value with function(value) atomically,
+        passing None for a missing key. If the function returns
+        None the key is removed (or not added).
+        Returns the new value.
+        The function runs under a lock and must not use the map.
+        """
+        return self._compute(key, function, None, True)
+
+    def _compute(self, key: str, function, default: object,
+                 drop_none: bool) -> object:
+        """
+        Replace the key's value with function(value) under the key's
+        stripe lock, passing default for a missing key. With
+        drop_none, a None result removes the key (or doesn't add
+        it); otherwise None is stored like any other value.
+        Returns the new value.
+        """
+        buckets, hash, index, lock = self._lock_bucket(key)
+        added = False
+        try:
+            linked_list = buckets.get_at_index(index)
+            node = linked_list.contains(key, hash)
+            value = function(default if node is None else node.value)
+            if self._snapshots is not None:
+                self._preserve(hash)
+            if value is None and drop_none:
+                if node is not None:
+                    self._unlink(linked_list, index, key, hash)
+            elif node is not None:
+                node.value = value
+            else:
+                self._insert(linked_list, index, key, value, hash)
+                added = True
+        finally:
+            lock.release()
+        if added:
+            self._grow_if_full()
+        return value
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Receives a key and a default value.
+        If the key is missing, adds it with the default value.
+        Returns the value now stored for the key.
+        """
+        return self._put_if_absent(key, default)[1]
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Receives a key and an amount.
+        Adds delta to the key's value, treating a missing key as 0.
+        Returns the new value.
+        """
+        return self.compute(key, lambda value: (value or 0) + delta)
+
+    def update_with(self, key: str, function, default: object = None) -> object:
+        """
+        Receives a key, a function of one argument and a default value.
+        Replaces the key's value with function(value), using default
+        as the value of a missing key.
+        Returns the new value.
+        """
+        return self._compute(key, function, default, False)
+
+    def get(self, key: str) -> object:
+        """
+        Receives a key.
+        Returns the value associated with the key.
+        If the key is not in the hash map, return None.
+        Takes no lock.
+        """
+        node = self._find(key)
+        if node is None:
+            return None
+        return node.value
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Receives a key.
+        Returns true if the key is in the hash map.
+        Otherwise, returns false.
+        Takes no lock.
+        """
+        return self._find(key) is not None
+
+    def _find(self, key: str) -> SLNode:
+        """
+        Return the node of key, or None if it is missing, taking no
+        lock. A miss is tried again while set_hash_function() runs,
+        or if it swapped the bucket array meanwhile, since the key
+        may have been hashed with a function the array wasn't built
+        with.
+        """
+        while True:
+            buckets = self._buckets
+            hash = self._hash_function(key)
+            linked_list = buckets.get_at_index(hash % buckets.length())
+            node = linked_list.contains(key, hash)
+            if (node is not None or
+                    (not self._switching and buckets is self._buckets)):
+                return node
+
+    def remove(self, key: str) -> None:
+        """
+        Receives a key.
+        Remove that key and the corresponding value from the hash map.
+        Does nothing if it doesn't find the key.
+        """
+        self._remove(key)
+
+    def _remove(self, key: str) -> bool:
+        """Remove key; return True if it was found."""
+        buckets, hash, index, lock = self._lock_bucket(key)
+        try:
+            if self._snapshots is not None:
+                self._preserve(hash)
+            return self._unlink(buckets.get_at_index(index), index, key, hash)
+        finally:
+            lock.release()
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash table.
+        """
+        return self.get_capacity() - sum(self._filled)
+
+    def clear(self) -> None:
+        """
+        Clear the content of the hash map.
+        """
+        self._lock_all()
+        try:
+            self._sizes = [0] * self._stripes
+            self._filled = [0] * self._stripes
+            self._mod_count += 1
+            self._snapshots = None
+            self._buckets = DynamicArray(
+                [LinkedList() for _ in range(self._capacity)])
+        finally:
+            self._unlock_all()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the has table.
+        Move all existing key/value pairs. Rehash the links.
+        """
+        if new_capacity < 1:
+            return
+        elif not self._is_prime(new_capacity):
+            new_capacity = self._next_prime(new_capacity)
+
+        self._lock_all()
+        try:
+            self._rehash(new_capacity)
+        finally:
+            self._unlock_all()
+
+    def set_hash_function(self, function) -> None:
+        """
+        Rehash every key with function and use it from now on, as
+        HashMap.set_hash_function() does, holding every stripe lock.
+        Nodes are copied with their new hashes, so readers still
+        walking the old array are not affected.
+        """
+        self._lock_all()
+        self._switching = True
+        try:
+            # swap in the function before the array; see _lock_bucket()
+            if self._stats is not None:
+                self._stats.function = function
+            else:
+                self._hash_function = function
+            self._rehash(self.get_capacity(), function)
+        finally:
+            self._switching = False
+            self._unlock_all()
+
+    def snapshot(self) -> ChainSnapshot:
+        """
+        Returns a read-only view of the map as it is now, as
+        HashMap.snapshot() does. Taking it waits for running writers.
+        """
+        self._lock_all()
+        try:
+            return super().snapshot()
+        finally:
+            self._unlock_all()
+
+    def _options(self) -> dict:
+        """Return the constructor arguments save() keeps with the map."""
+        return {'max_load': self._max_load, 'stripes': self._stripes}
+
+    def save(self, path: str) -> None:
+        """
+        Write the map to path as HashMap.save() does, holding every
+        stripe lock so the file is a consistent snapshot.
+        """
+        self._lock_all()
+        try:
+            super().save(path)
+        finally:
+            self._unlock_all()
+
+    @classmethod
+    def load(cls, path: str) -> "ConcurrentHashMap":
+        """
+        Return a new map read from a file written by save().
+        Nodes go straight back into their saved chains without
+        calling the hash function.
+        """
+        hash_map = super().load(path)
+        for idx in range(hash_map.get_capacity()):
+            length = hash_map._buckets.get_at_index(idx).length()
+            stripe = idx % hash_map._stripes
+            hash_map._sizes[stripe] += length
+            if length:
+                hash_map._filled[stripe] += 1
+        return hash_map
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array containing a tuple of (key, value)
+        for each key/value pair in the hash map.
+        """
+        tuple_array = DynamicArray()
+        for pair in self.items():
+            tuple_array.append(pair)
+        return tuple_array
+
+    # ------------------------------------------------------------------ #
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable (or DynamicArray) of (key, value) tuples.
+        Puts every pair; each put is atomic, the batch as a whole is not.
+        """
+        for key, value in pairs:
+            self.put(key, value)
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Returns a dynamic array with the value of each key, in the
+        same order, holding None for keys that are not found.
+        """
+        values_da = DynamicArray()
+        for key in keys:
+            values_da.append(self.get(key))
+        return values_da
+
+    def remove_many(self, keys) -> int:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Removes each key that is found.
+        Returns the number of keys removed.
+        """
+        removed = 0
+        for key in keys:
+            if self._remove(key):
+                removed += 1
+        return removed
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map, one at
+        a time. Walks the bucket array current when iteration starts;
+        changes made meanwhile may or may not be seen, and no error
+        is raised for them.
+        """
+        buckets = self._buckets
+        for idx in range(buckets.length()):
+            for node in buckets.get_at_index(idx):
+                yield node.key, node.value
@@ -0,0 +1,410 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Bucketized cuckoo hash map: every key lives in one of two
+#              buckets (or a small stash), so a lookup reads at most two
+#              buckets whatever the keys.
+
+
+import random
+
+from a6_include import DynamicArray
+
+_MASK_64 = (1 << 64) - 1
+
+# rebuilds with fresh seeds tried before giving up on placing every
+# key in its buckets; the table may double before the one at this index
+_REBUILD_TRIES = 4
+_GROW_AT_TRY = 2
+
+
+class CuckooHashMap:
+    """
+    Cuckoo hash map with buckets of several slots.
+    Each key may only sit in one of two buckets, chosen by two hashes
+    derived from its hash code with independently seeded
+    multiply-shift hashing. An insert into two full buckets evicts a
+    random entry, which moves to its other bucket, and so on; a walk
+    that runs too long leaves its last entry in a small stash, and a
+    full stash makes the map pick new seeds and rebuild.
+    get(), contains_key() and remove() read at most two buckets and
+    the stash, so the worst case doesn't depend on the keys.
+    Hash codes are cached, so neither growing nor reseeding calls the
+    hash function again; keys whose full hash codes collide can't be
+    separated by any seed and, past what two buckets and the stash
+    hold, make the stash grow instead.
+    Supports the same methods as hash_map_oa.HashMap.
+    """
+
+    def __init__(self, capacity: int = 16, function=hash,
+                 slots: int = 4,
+                 max_load: float = 0.9,
+                 stash_size: int = 4,
+                 max_kicks: int = 100) -> None:
+        """
+        Initialize new CuckooHashMap with room for capacity entries
+        (rounded up to whole buckets of slots entries).
+        function should rarely give two keys the same hash code:
+        the builtin hash, hash_functions.blake2b_64 or KeyedHash are
+        fine, hash_function_1 is not. The table doubles once more than
+        max_load of its slots would be used; max_kicks bounds an
+        eviction walk before its last entry goes to the stash.
+        """
+        self._hash_function = function
+        self._slots = slots
+        self._max_load = max_load
+        self._stash_size = stash_size
+        self._max_kicks = max_kicks
+        self._random = random.Random()
+        self._reseed()
+        self._allocate(self._round_capacity(capacity))
+        self._size = 0
+
+        # stash entries are [hash, key, value] lists; a rebuild that
+        # couldn't bring the stash under stash_size raises this limit
+        # so the next one waits until the stash doubles
+        self._stash = []
+        self._stash_limit = stash_size
+
+        # bumped on every insert, removal and rebuild so iterators
+        # can tell that the map changed under them
+        self._mod_count = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            if self._hashes[i] is None:
+                out += str(i) + ': None\n'
+            else:
+                out += (str(i) + ': K: ' + str(self._keys[i]) +
+                        ' V: ' + str(self._values[i]) + '\n')
+        for hash, key, value in self._stash:
+            out += 'stash: K: ' + str(key) + ' V: ' + str(value) + '\n'
+        return out
+
+    def _round_capacity(self, capacity: int) -> int:
+        """Return capacity rounded up to a whole number of buckets."""
+        return self._slots * max(1, -(-capacity // self._slots))
+
+    def _reseed(self) -> None:
+        """Pick new seeds for both bucket hashes."""
+        bits = self._random.getrandbits
+        self._seed_1, self._seed_2 = bits(64), bits(64)
+        self._multiplier_1, self._multiplier_2 = bits(64) | 1, bits(64) | 1
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the table with an empty one of capacity slots."""
+        self._capacity = capacity
+        self._bucket_count = capacity // self._slots
+        # an empty slot has a hash of None
+        self._hashes = [None] * capacity
+        self._keys = [None] * capacity
+        self._values = [None] * capacity
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Returns the hash table load factor."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Returns the number of empty slots in the hash table."""
+        return self._capacity - self._size + len(self._stash)
+
+    # ------------------------------------------------------------------ #
+
+    def _first_bucket(self, hash: int) -> int:
+        """Return the index of the first slot of hash's first bucket."""
+        mixed = ((hash ^ self._seed_1) * self._multiplier_1) & _MASK_64
+        return (mixed >> 32) % self._bucket_count * self._slots
+
+    def _second_bucket(self, hash: int) -> int:
+        """Return the index of the first slot of hash's second bucket."""
+        mixed = ((hash ^ self._seed_2) * self._multiplier_2) & _MASK_64
+        return (mixed >> 32) % self._bucket_count * self._slots
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Return the slot holding key in either of its buckets,
+        or -1 if it is not in the table (it may be in the stash).
+        """
+        hashes, keys, slots = self._hashes, self._keys, self._slots
+        # _first_bucket() and _second_bucket() inlined, as this is
+        # the hot path of every operation
+        mixed = ((hash ^ self._seed_1) * self._multiplier_1) & _MASK_64
+        start = (mixed >> 32) % self._bucket_count * slots
+        for slot in range(start, start + slots):
+            if hashes[slot] == hash and keys[slot] == key:
+                return slot
+        mixed = ((hash ^ self._seed_2) * self._multiplier_2) & _MASK_64
+        start = (mixed >> 32) % self._bucket_count * slots
+        for slot in range(start, start + slots):
+            if hashes[slot] == hash and keys[slot] == key:
+                return slot
+        return -1
+
+    def _find_stashed(self, key: str, hash: int) -> int:
+        """Return the stash index of key, or -1 if it is not stashed."""
+        for index, (stashed_hash, stashed_key, _) in enumerate(self._stash):
+            if stashed_hash == hash and stashed_key == key:
+                return index
+        return -1
+
+    def _free_slot(self, start: int) -> int:
+        """Return an empty slot of the bucket at start, or -1 if full."""
+        try:
+            return self._hashes.index(None, start, start + self._slots)
+        except ValueError:
+            return -1
+
+    def _place(self, hash: int, key: str, value: object) -> list:
+        """
+        Put an entry known not to be in the map into one of its
+        buckets, evicting entries along a random walk if both are
+        full. Return None once every entry has a slot, or the
+        [hash, key, value] of the entry left over when the walk
+        passes max_kicks.
+        """
+        hashes, keys, values = self._hashes, self._keys, self._values
+        first = self._first_bucket(hash)
+        slot = self._free_slot(first)
+        if slot == -1:
+            second = self._second_bucket(hash)
+            slot = self._free_slot(second)
+            bucket = self._random.choice((first, second))
+
+        kicks = 0
+        while slot == -1:
+            if kicks == self._max_kicks:
+                return [hash, key, value]
+            kicks += 1
+
+            # swap the entry with a random one of the full bucket,
+            # then try the evicted entry's other bucket
+            slot = bucket + self._random.randrange(self._slots)
+            hash, hashes[slot] = hashes[slot], hash
+            key, keys[slot] = keys[slot], key
+            value, values[slot] = values[slot], value
+
+            other = self._first_bucket(hash)
+            if other == bucket:
+                other = self._second_bucket(hash)
+            bucket = other
+            slot = self._free_slot(bucket)
+
+        hashes[slot] = hash
+        keys[slot] = key
+        values[slot] = value
+        return None
+
+    def _add(self, hash: int, key: str, value: object) -> None:
+        """
+        Add an entry known not to be in the map, stashing a leftover
+        entry and rebuilding with new seeds once the stash is full.
+        """
+        leftover = self._place(hash, key, value)
+        if leftover is None:
+            return
+        if len(self._stash) < self._stash_limit:
+            self._stash.append(leftover)
+            return
+        self._rebuild(self._capacity, True, leftover)
+
+    def _place_all(self, entries: list, stash_limit: int) -> bool:
+        """
+        Place entries into the empty table, stashing up to
+        stash_limit leftovers. Return False if more are left over.
+        """
+        for hash, key, value in entries:
+            leftover = self._place(hash, key, value)
+            if leftover is not None:
+                if len(self._stash) == stash_limit:
+                    return False
+                self._stash.append(leftover)
+        return True
+
+    def _rebuild(self, capacity: int, reseed: bool, extra: list = None) -> None:
+        """
+        Move every entry, and extra if given, into a new table of
+        capacity slots, picking new seeds first if reseed is set.
+        Tries new seeds, and then a larger table, for as long as the
+        stash overflows; if that never helps (keys with equal hash
+        codes), the stash limit is raised instead.
+        """
+        entries = [[self._hashes[slot], self._keys[slot], self._values[slot]]
+                   for slot in range(self._capacity)
+                   if self._hashes[slot] is not None]
+        entries.extend(self._stash)
+        if extra is not None:
+            entries.append(extra)
+        self._mod_count += 1
+
+        for attempt in range(_REBUILD_TRIES):
+            # a table at low load that still overflows holds keys with
+            # equal hash codes, which a larger table wouldn't separate
+            if (attempt == _GROW_AT_TRY
+                    and len(entries) > self._max_load * capacity / 2):
+                capacity *= 2
+            if reseed or attempt:
+                self._reseed()
+            self._allocate(capacity)
+            self._stash = []
+            if self._place_all(entries, self._stash_size):
+                self._stash_limit = self._stash_size
+                return
+
+        self._allocate(capacity)
+        self._stash = []
+        self._place_all(entries, len(entries))
+        self._stash_limit = max(self._stash_size, 2 * len(self._stash))
+
+    def _drain_stash(self) -> None:
+        """Move stashed entries whose buckets have room back into the table."""
+        for entry in list(self._stash):
+            hash = entry[0]
+            slot = self._free_slot(self._first_bucket(hash))
+            if slot == -1:
+                slot = self._free_slot(self._second_bucket(hash))
+            if slot != -1:
+                self._hashes[slot], self._keys[slot], self._values[slot] = entry
+                self._stash.remove(entry)
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update a key/value pair in the hash map.
+        For existing key, update value.
+        For new key, add key/value pair, doubling the table first if
+        the load factor would go above max_load.
+        """
+        hash = self._hash_function(key)
+        slot = self._find(key, hash)
+        if slot != -1:
+            self._values[slot] = value
+            return
+        index = self._find_stashed(key, hash)
+        if index != -1:
+            self._stash[index][2] = value
+            return
+
+        if self._size + 1 > self._max_load * self._capacity:
+            self._rebuild(2 * self._capacity, False)
+        self._add(hash, key, value)
+        self._size += 1
+        self._mod_count += 1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value corresponding with the given key.
+        Return none if the key is not found.
+        """
+        hash = self._hash_function(key)
+        slot = self._find(key, hash)
+        if slot != -1:
+            return self._values[slot]
+        if self._stash:
+            index = self._find_stashed(key, hash)
+            if index != -1:
+                return self._stash[index][2]
+        return None
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns true if the given key is in the hash map.
+        Otherwise, returns false.
+        """
+        hash = self._hash_function(key)
+        if self._find(key, hash) != -1:
+            return True
+        return bool(self._stash) and self._find_stashed(key, hash) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key/value pair of the given key.
+        If key is not found, does nothing.
+        """
+        hash = self._hash_function(key)
+        slot = self._find(key, hash)
+        if slot != -1:
+            self._hashes[slot] = self._keys[slot] = self._values[slot] = None
+        else:
+            index = self._find_stashed(key, hash) if self._stash else -1
+            if index == -1:
+                return
+            del self._stash[index]
+
+        self._size -= 1
+        self._mod_count += 1
+        if self._stash:
+            self._drain_stash()
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the hash table, rounded up to whole
+        buckets. Entries are placed by their cached hash codes.
+        Does nothing if new_capacity is less than the number of entries.
+        """
+        if new_capacity < self._size:
+            return
+        self._rebuild(self._round_capacity(new_capacity), False)
+
+    def clear(self) -> None:
+        """
+        Clear the content of the hash map.
+        Does not change the hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._stash = []
+        self._stash_limit = self._stash_size
+        self._size = 0
+        self._mod_count += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of tuples (key, value)
+        stored in the hash map
+        """
+        tuples_da = DynamicArray()
+        for pair in self.items():
+            tuples_da.append(pair)
+        return tuples_da
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map, one at
+        a time: the table in slot order, then the stash.
+        Raises RuntimeError if the map changes size or is rebuilt
+        while the iteration is running.
+        """
+        expected = self._mod_count
+        hashes, keys, values = self._hashes, self._keys, self._values
+        for slot in range(len(hashes)):
+            if hashes[slot] is not None:
+                yield keys[slot], values[slot]
+                if self._mod_count != expected:
+                    raise RuntimeError('HashMap changed size during iteration')
+        for _, key, value in list(self._stash):
+            yield key, value
+            if self._mod_count != expected:
+                raise RuntimeError('HashMap changed size during iteration')
+
+    def keys(self):
+        """Yield each key stored in the hash map, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the hash map, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
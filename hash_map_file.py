@@ -0,0 +1,326 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Binary file format for saving and loading both HashMaps,
+#              and a read-only map served straight from an mmap of a file.
+#
+# A file holds, in order (all integers little-endian):
+#   header       magic, version, layout, hash function id, capacity, size,
+#                tombstone count and the length of the metadata that
+#                follows (a pickled dict of the map's options and any
+#                hash function key)
+#   slot table   one entry per bucket: cached hash, offset of its first
+#                record, record count and state (empty, live/chain,
+#                tombstone)
+#   records      cached hash, key and value lengths, then the pickled
+#                key and value; a chain's records are stored together
+#
+# Cached hashes are kept as 16 byte signed integers, so loading never
+# calls the hash function. Keys and values are pickled, so only load
+# files from a trusted source.
+
+
+import mmap
+import pickle
+import struct
+
+from a6_include import hash_function_1, hash_function_2
+from hash_functions import KeyedHash, blake2b_64, fnv1a_64, is_stable
+
+_MAGIC = b'HMAP'
+_VERSION = 1
+
+_HEADER = struct.Struct('<4sBBBxHIQQQ')
+_SLOT = struct.Struct('<16sQII')
+_RECORD = struct.Struct('<16sII')
+
+# slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+# step growth value that marks a separate chaining file
+CHAINED = 255
+
+# ids 1-255 are reserved for the hash functions shipped with the maps
+_FUNCTIONS = {
+    1: hash_function_1,
+    2: hash_function_2,
+    3: fnv1a_64,
+    5: blake2b_64,
+}
+_KEYED_HASH_ID = 4
+
+
+class HashMapFileError(Exception):
+    pass
+
+
+def register_hash_function(function_id: int, function) -> None:
+    """
+    Give a hash function of your own an id so maps using it can be
+    saved. Ids below 256 are reserved. The function must be stable
+    (see hash_functions.is_stable), since a loaded file trusts the
+    hashes stored in it.
+    """
+    if function_id < 256:
+        raise ValueError('hash function ids below 256 are reserved')
+    if not is_stable(function):
+        raise ValueError('hash function ' + repr(function) +
+                         ' is not stable across processes')
+    _FUNCTIONS[function_id] = function
+
+
+def _function_id(function) -> (int, bytes):
+    """Return the id of function and the key it needs, if any."""
+    if isinstance(function, KeyedHash):
+        return _KEYED_HASH_ID, function.key
+    for function_id, known in _FUNCTIONS.items():
+        if known is function:
+            return function_id, None
+    if not is_stable(function):
+        raise ValueError('hash function ' + repr(function) + ' is not '
+                         'stable across processes and cannot be saved')
+    raise ValueError('hash function ' + repr(function) + ' has no id; '
+                     'give it one with register_hash_function()')
+
+
+def _function_from_id(function_id: int, key: bytes):
+    """Return the hash function saved under function_id."""
+    if function_id == _KEYED_HASH_ID:
+        return KeyedHash(key)
+    if function_id not in _FUNCTIONS:
+        raise HashMapFileError('unknown hash function id ' + str(function_id))
+    return _FUNCTIONS[function_id]
+
+
+def _hash_bytes(hash: int) -> bytes:
+    """Encode a cached hash code as 16 bytes."""
+    try:
+        return hash.to_bytes(16, 'little', signed=True)
+    except OverflowError:
+        raise ValueError('hash code ' + str(hash) + ' does not fit in 16 bytes')
+
+
+def write_map(path: str, step_growth: int, capacity: int, size: int,
+              tombstones: int, function, options: dict, buckets) -> None:
+    """
+    Write a map to path.
+    step_growth is CHAINED for a separate chaining map, or the probe
+    step growth of an open addressing map. buckets yields, for each
+    bucket in order, a list of (hash, key, value) tuples, or the
+    TOMBSTONE constant for a tombstone.
+    """
+    function_id, function_key = _function_id(function)
+    meta = pickle.dumps({'function_key': function_key, 'options': options})
+
+    records_start = _HEADER.size + len(meta) + capacity * _SLOT.size
+    slots = bytearray()
+    records = bytearray()
+    for bucket in buckets:
+        if bucket is TOMBSTONE:
+            slots += _SLOT.pack(bytes(16), 0, 0, TOMBSTONE)
+            continue
+        if not bucket:
+            slots += _SLOT.pack(bytes(16), 0, 0, EMPTY)
+            continue
+
+        offset = records_start + len(records)
+        for hash, key, value in bucket:
+            key_bytes = pickle.dumps(key)
+            value_bytes = pickle.dumps(value)
+            records += _RECORD.pack(_hash_bytes(hash), len(key_bytes),
+                                    len(value_bytes))
+            records += key_bytes
+            records += value_bytes
+        # an open addressing slot also keeps the hash, so lookups
+        # can skip a slot without reading its record
+        slots += _SLOT.pack(_hash_bytes(bucket[0][0]), offset, len(bucket),
+                            LIVE)
+
+    with open(path, 'wb') as file:
+        file.write(_HEADER.pack(_MAGIC, _VERSION, step_growth, 0, function_id,
+                                len(meta), capacity, size, tombstones))
+        file.write(meta)
+        file.write(slots)
+        file.write(records)
+
+
+def _read_header(data) -> dict:
+    """Parse the header and metadata at the start of data."""
+    if len(data) < _HEADER.size:
+        raise HashMapFileError('file is too short to be a saved HashMap')
+    (magic, version, step_growth, _, function_id, meta_len, capacity, size,
+     tombstones) = _HEADER.unpack_from(data, 0)
+    if magic != _MAGIC:
+        raise HashMapFileError('not a saved HashMap')
+    if version != _VERSION:
+        raise HashMapFileError('unsupported file version ' + str(version))
+
+    meta = pickle.loads(data[_HEADER.size:_HEADER.size + meta_len])
+    return {
+        'step_growth': step_growth,
+        'function': _function_from_id(function_id, meta['function_key']),
+        'options': meta['options'],
+        'capacity': capacity,
+        'size': size,
+        'tombstones': tombstones,
+        'slots': _HEADER.size + meta_len,
+    }
+
+
+def _read_record(data, offset: int) -> (int, object, object, int):
+    """
+    Read the record at offset.
+    Return its hash, key, value and the offset of the next record.
+    """
+    hash_bytes, key_len, value_len = _RECORD.unpack_from(data, offset)
+    offset += _RECORD.size
+    key = pickle.loads(data[offset:offset + key_len])
+    offset += key_len
+    value = pickle.loads(data[offset:offset + value_len])
+    offset += value_len
+    return int.from_bytes(hash_bytes, 'little', signed=True), key, value, offset
+
+
+def read_map(path: str) -> (dict, list):
+    """
+    Read the map saved at path in one go.
+    Return the header, as a dict, and a list holding for each bucket
+    a list of (hash, key, value) tuples, or TOMBSTONE.
+    """
+    with open(path, 'rb') as file:
+        data = file.read()
+    header = _read_header(data)
+
+    buckets = []
+    for index in range(header['capacity']):
+        _, offset, count, state = _SLOT.unpack_from(
+            data, header['slots'] + index * _SLOT.size)
+        if state == TOMBSTONE:
+            buckets.append(TOMBSTONE)
+            continue
+        bucket = []
+        for _ in range(count):
+            hash, key, value, offset = _read_record(data, offset)
+            bucket.append((hash, key, value))
+        buckets.append(bucket)
+
+    return header, buckets
+
+
+class MappedHashMap:
+    """
+    Read-only HashMap served straight from a memory-mapped file
+    written by save(). Opening it reads only the header; get() and
+    contains_key() hash the key and read just the slots and records
+    on its probe path or chain, so even a huge map is ready at once.
+    Supported methods are: get, contains_key, get_size, get_capacity,
+    table_load, items, keys, values, close
+    """
+
+    def __init__(self, path: str) -> None:
+        """Map the file at path into memory and read its header."""
+        with open(path, 'rb') as file:
+            self._data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        header = _read_header(self._data)
+        self._hash_function = header['function']
+        self._capacity = header['capacity']
+        self._size = header['size']
+        self._step_growth = header['step_growth']
+        self._slots = header['slots']
+
+    def __enter__(self) -> "MappedHashMap":
+        """Return the map for use in a with statement."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the map at the end of a with statement."""
+        self.close()
+
+    def close(self) -> None:
+        """Unmap the file."""
+        self._data.close()
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Return the hash table load factor."""
+        return self._size / self._capacity
+
+    def _find(self, key: str) -> (bool, object):
+        """Return (True, value) if key is found, (False, None) otherwise."""
+        hash = self._hash_function(key)
+        hash_bytes = _hash_bytes(hash)
+        data = self._data
+        index = hash % self._capacity
+
+        if self._step_growth == CHAINED:
+            _, offset, count, _ = _SLOT.unpack_from(
+                data, self._slots + index * _SLOT.size)
+            for _ in range(count):
+                record_hash, key_len, value_len = _RECORD.unpack_from(data, offset)
+                start = offset + _RECORD.size
+                offset = start + key_len + value_len
+                if (record_hash == hash_bytes and
+                        pickle.loads(data[start:start + key_len]) == key):
+                    return True, pickle.loads(data[start + key_len:offset])
+            return False, None
+
+        # probe exactly as the open addressing map that wrote the file
+        step = 1
+        while True:
+            slot_hash, offset, _, state = _SLOT.unpack_from(
+                data, self._slots + index * _SLOT.size)
+            if state == EMPTY:
+                return False, None
+            if state == LIVE and slot_hash == hash_bytes:
+                _, record_key, value, _ = _read_record(data, offset)
+                if record_key == key:
+                    return True, value
+            index = (index + step) % self._capacity
+            step += self._step_growth
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value corresponding with the given key.
+        Return none if the key is not found.
+        """
+        return self._find(key)[1]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns true if the given key is in the hash map.
+        Otherwise, returns false.
+        """
+        return self._find(key)[0]
+
+    def items(self):
+        """Yield each (key, value) pair stored in the file, one at a time."""
+        for index in range(self._capacity):
+            _, offset, count, state = _SLOT.unpack_from(
+                self._data, self._slots + index * _SLOT.size)
+            if state != LIVE:
+                continue
+            for _ in range(count):
+                _, key, value, offset = _read_record(self._data, offset)
+                yield key, value
+
+    def keys(self):
+        """Yield each key stored in the file, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the file, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the map."""
+        return self.keys()
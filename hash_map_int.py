@@ -0,0 +1,419 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Open addressing hash map for integer keys, stored in NumPy
+#              arrays, with batch operations that hash and probe whole
+#              arrays of keys at once. Needs NumPy.
+
+
+from operator import index
+
+from a6_include import DynamicArray
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Fibonacci hashing: the top bits of key * 2 ** 64 / golden ratio
+_GOLDEN_64 = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+# slot states
+EMPTY = 0
+LIVE = 1
+TOMBSTONE = 2
+
+
+class IntHashMap:
+    """
+    HashMap for keys that fit in a signed 64 bit integer.
+    Keys, values and slot states live in three NumPy arrays and
+    collisions are resolved by linear probing over a power-of-two
+    capacity. Single key methods work like the other maps'; the
+    *_many methods take NumPy arrays (or anything np.asarray accepts)
+    and hash and probe every key in a handful of array operations,
+    which is where the speed comes from.
+    """
+
+    def __init__(self, capacity: int = 16, max_load: float = 0.5,
+                 value_dtype=object) -> None:
+        """
+        Initialize new IntHashMap.
+        max_load bounds the share of slots holding live entries or
+        tombstones. value_dtype is the NumPy dtype of the values; a
+        numeric one such as np.int64 makes counting much faster, but
+        values then have to fit it.
+        """
+        if np is None:
+            raise ImportError('IntHashMap needs NumPy (pip install numpy)')
+
+        self._max_load = max_load
+        self._value_dtype = np.dtype(value_dtype)
+        self._size = 0
+        self._tombstones = 0
+        self._mod_count = 0
+        self._allocate(self._round_capacity(capacity))
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for i in range(self._capacity):
+            if self._states[i] == LIVE:
+                out += str(i) + ': ' + str(self._keys[i]) + ' -> ' + \
+                    str(self._values[i]) + '\n'
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """Return the smallest power of two, at least 8, at or above capacity."""
+        return max(8, 1 << max(capacity - 1, 1).bit_length())
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the arrays with empty ones of the given capacity."""
+        self._capacity = capacity
+        self._shift = 64 - (capacity.bit_length() - 1)
+        self._keys = np.zeros(capacity, dtype=np.int64)
+        if self._value_dtype == object:
+            self._values = np.full(capacity, None, dtype=object)
+        else:
+            self._values = np.zeros(capacity, dtype=self._value_dtype)
+        self._states = np.zeros(capacity, dtype=np.uint8)
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Returns the hash table load factor."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Returns the number of slots not holding a live entry."""
+        return self._capacity - self._size
+
+    # ------------------------------------------------------------------ #
+
+    def _slot(self, key: int) -> int:
+        """Return the home slot of a single key."""
+        # a NumPy integer would keep its fixed width and overflow
+        key = index(key)
+        return ((key & _MASK_64) * _GOLDEN_64 & _MASK_64) >> self._shift
+
+    def _home_slots(self, keys):
+        """Return the home slots of an int64 array of keys."""
+        hashes = keys.astype(np.uint64) * np.uint64(_GOLDEN_64)
+        return (hashes >> np.uint64(self._shift)).astype(np.int64)
+
+    def _find(self, key: int) -> int:
+        """Return the slot of key, or -1 if the key is not found."""
+        key = index(key)
+        mask = self._capacity - 1
+        states, keys = self._states, self._keys
+        slot = self._slot(key)
+        while True:
+            state = states[slot]
+            if state == EMPTY:
+                return -1
+            if state == LIVE and keys[slot] == key:
+                return slot
+            slot = (slot + 1) & mask
+
+    def _find_many(self, keys):
+        """
+        Return the slot of every key of an int64 array, -1 for keys
+        not found. All keys take their next probe step together.
+        """
+        mask = self._capacity - 1
+        slots = self._home_slots(keys)
+        found = np.full(keys.size, -1, dtype=np.int64)
+        pending = np.arange(keys.size)
+        while pending.size:
+            probe = slots[pending]
+            states = self._states[probe]
+            hit = (states == LIVE) & (self._keys[probe] == keys[pending])
+            found[pending[hit]] = probe[hit]
+            going = (states != EMPTY) & ~hit
+            pending = pending[going]
+            slots[pending] = (probe[going] + 1) & mask
+        return found
+
+    def _insert_new(self, keys, values) -> None:
+        """
+        Insert distinct keys known not to be in the map, into the
+        first empty slot or tombstone on each probe path. Keys racing
+        for the same free slot all write their position into a claim
+        array; the one whose write stuck takes the slot and the rest
+        probe on. The caller makes sure there is room.
+        """
+        mask = self._capacity - 1
+        slots = self._home_slots(keys)
+        claims = np.empty(self._capacity, dtype=np.int64)
+        pending = np.arange(keys.size)
+        while pending.size:
+            probe = slots[pending]
+            free = self._states[probe] != LIVE
+            claims[probe[free]] = pending[free]
+            won = free & (claims[probe] == pending)
+            free_slots, winners = probe[won], pending[won]
+
+            self._tombstones -= int(
+                np.count_nonzero(self._states[free_slots] == TOMBSTONE))
+            self._keys[free_slots] = keys[winners]
+            self._values[free_slots] = values[winners]
+            self._states[free_slots] = LIVE
+
+            going = ~won
+            pending = pending[going]
+            slots[pending] = (probe[going] + 1) & mask
+
+        self._size += keys.size
+        self._mod_count += 1
+
+    def _reserve(self, count: int) -> None:
+        """
+        Make room for count new keys: grow the table, or just drop
+        tombstones if live entries would still fit.
+        """
+        if self._size + self._tombstones + count <= self._max_load * self._capacity:
+            return
+
+        capacity = self._capacity
+        while self._size + count > self._max_load * capacity:
+            capacity *= 2
+        self._rebuild(capacity)
+
+    def _rebuild(self, capacity: int) -> None:
+        """Move every live entry into new arrays of the given capacity."""
+        live = self._states == LIVE
+        keys, values = self._keys[live], self._values[live]
+        self._allocate(capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._insert_new(keys, values)
+
+    def _value(self, slot: int) -> object:
+        """Return the value in slot as a plain Python object."""
+        value = self._values[slot]
+        return value.item() if isinstance(value, np.generic) else value
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: int, value: object) -> None:
+        """
+        Update a key/value pair in the hash map.
+        For existing key, update value.
+        For new key, add key/value pair.
+        """
+        slot = self._find(key)
+        if slot != -1:
+            self._values[slot] = value
+            return
+
+        self._reserve(1)
+        mask = self._capacity - 1
+        slot = self._slot(key)
+        while self._states[slot] == LIVE:
+            slot = (slot + 1) & mask
+        if self._states[slot] == TOMBSTONE:
+            self._tombstones -= 1
+        self._keys[slot] = key
+        self._values[slot] = value
+        self._states[slot] = LIVE
+        self._size += 1
+        self._mod_count += 1
+
+    def get(self, key: int) -> object:
+        """
+        Returns the value corresponding with the given key.
+        Return none if the key is not found.
+        """
+        slot = self._find(key)
+        return None if slot == -1 else self._value(slot)
+
+    def contains_key(self, key: int) -> bool:
+        """
+        Returns true if the given key is in the hash map.
+        Otherwise, returns false.
+        """
+        return self._find(key) != -1
+
+    def remove(self, key: int) -> None:
+        """
+        Removes the key/value pair of the given key, leaving a
+        tombstone. If key is not found, does nothing.
+        """
+        slot = self._find(key)
+        if slot == -1:
+            return
+        self._states[slot] = TOMBSTONE
+        self._values[slot] = None if self._value_dtype == object else 0
+        self._size -= 1
+        self._tombstones += 1
+        self._mod_count += 1
+
+    def clear(self) -> None:
+        """
+        Clear the content of the hash map.
+        Does not change the hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._size = 0
+        self._tombstones = 0
+        self._mod_count += 1
+
+    # ------------------------------------------------------------------ #
+
+    def put_many(self, keys, values) -> None:
+        """
+        Receives an array of keys and an array of as many values.
+        Puts every pair, as put() would one by one, so the last value
+        of a repeated key wins.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        values = np.asarray(values, dtype=self._value_dtype)
+        if keys.size == 0:
+            return
+
+        # keep the last occurrence of each key
+        _, reversed_index = np.unique(keys[::-1], return_index=True)
+        last = keys.size - 1 - reversed_index
+        keys, values = keys[last], values[last]
+
+        slots = self._find_many(keys)
+        found = slots != -1
+        self._values[slots[found]] = values[found]
+
+        missing = ~found
+        self._reserve(int(np.count_nonzero(missing)))
+        self._insert_new(keys[missing], values[missing])
+
+    def get_many(self, keys, default: object = None):
+        """
+        Receives an array of keys.
+        Returns an array of value_dtype with the value of each key,
+        holding default for keys that are not found. A map with a
+        numeric value_dtype returns an object array if default is None.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        slots = self._find_many(keys)
+        found = slots != -1
+        dtype = object if default is None else self._value_dtype
+        values = np.full(keys.size, default, dtype=dtype)
+        values[found] = self._values[slots[found]]
+        return values
+
+    def contains_many(self, keys):
+        """
+        Receives an array of keys.
+        Returns a boolean array telling which keys are in the map.
+        """
+        return self._find_many(np.asarray(keys, dtype=np.int64)) != -1
+
+    def remove_many(self, keys) -> int:
+        """
+        Receives an array of keys.
+        Removes each key that is found.
+        Returns the number of keys removed.
+        """
+        slots = self._find_many(np.unique(np.asarray(keys, dtype=np.int64)))
+        slots = slots[slots != -1]
+        self._states[slots] = TOMBSTONE
+        self._values[slots] = None if self._value_dtype == object else 0
+        self._size -= slots.size
+        self._tombstones += slots.size
+        self._mod_count += 1
+        return slots.size
+
+    def _slots_for(self, keys):
+        """
+        Return the slot of every key of an int64 array, adding the
+        missing keys first with a value of 0.
+        """
+        distinct = np.unique(keys)
+        missing = distinct[self._find_many(distinct) == -1]
+        if missing.size:
+            self._reserve(missing.size)
+            self._insert_new(missing, np.zeros(missing.size,
+                                               dtype=self._value_dtype))
+        return self._find_many(keys)
+
+    def increment_many(self, keys, delta: int = 1) -> None:
+        """
+        Receives an array of keys.
+        Adds delta to the value of a key for every time it occurs,
+        treating a missing key as 0.
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        if keys.size == 0:
+            return
+        counts = np.bincount(self._slots_for(keys), minlength=self._capacity)
+        touched = np.flatnonzero(counts)
+        self._values[touched] += counts[touched] * delta
+
+    # ------------------------------------------------------------------ #
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of tuples (key, value)
+        stored in the hash map
+        """
+        return DynamicArray(list(self.items()))
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map.
+        Raises RuntimeError if the map has keys added or removed
+        while the iteration is running.
+        """
+        expected = self._mod_count
+        live = self._states == LIVE
+        for key, value in zip(self._keys[live].tolist(),
+                              self._values[live].tolist()):
+            yield key, value
+            if self._mod_count != expected:
+                raise RuntimeError('HashMap changed size during iteration')
+
+    def keys(self):
+        """Yield each key stored in the hash map, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the hash map, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+
+def find_mode(values) -> (DynamicArray, int):
+    """
+    Receives an array of integers (a NumPy array or anything
+    np.asarray accepts).
+    Returns the same (modes, count) tuple as hash_map_sc.find_mode,
+    with the modes in the same order, counting every value with a
+    few array operations on an IntHashMap.
+    """
+    keys = np.asarray(values, dtype=np.int64)
+    if keys.size == 0:
+        return DynamicArray(), 0
+
+    counts = IntHashMap(keys.size, value_dtype=np.int64)
+    slots = counts._slots_for(keys)
+    counts._values += np.bincount(slots, minlength=counts._capacity)
+
+    # a value reaches its final count at its last occurrence, which is
+    # the order find_mode lists the modes in
+    last = np.full(counts._capacity, -1, dtype=np.int64)
+    np.maximum.at(last, slots, np.arange(keys.size))
+
+    mode_count = counts._values.max()
+    mode_slots = np.flatnonzero(counts._values == mode_count)
+    mode_slots = mode_slots[np.argsort(last[mode_slots])]
+    return DynamicArray(counts._keys[mode_slots].tolist()), int(mode_count)
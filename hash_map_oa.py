@@ -3,27 +3,91 @@
 # Description: Hash map implementation with open addressing
 
 
-from a6_include import (DynamicArray, HashEntry,
+import weakref
+from time import perf_counter
+
+from a6_include import (DynamicArray, HashEntry, entry_pool, to_list,
                         hash_function_1, hash_function_2)
+from hash_functions import KeyedHash
+from hash_map_file import (TOMBSTONE, HashMapFileError, read_map,
+                           write_map)
+from map_stats import MapStats
+from primes import grow_prime, is_prime, next_prime
+from snapshot import ProbeSnapshot
+
+
+# stands in for an entry that incremental resizing has already moved
+# out of the old bucket array; it reads as a tombstone, so probes for
+# entries still waiting to move walk past it
+_MIGRATED = HashEntry(None, None)
+_MIGRATED.is_tombstone = True
 
 
 class HashMap:
-    def __init__(self, capacity: int, function) -> None:
+    # probe offsets grow by this much more at every step: 1, 3, 5, ...
+    # gives the quadratic offsets 1, 4, 9, ... without a power per step
+    _step_growth = 2
+
+    def __init__(self, capacity: int, function,
+                 max_occupancy: float = 0.5,
+                 max_probe_length: int = 32,
+                 incremental_resize: bool = False,
+                 migrate_batch: int = 64,
+                 adaptive_hash: bool = False) -> None:
         """
         Initialize new HashMap that uses
         quadratic probing for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        max_occupancy bounds the share of buckets holding live entries
+        or tombstones, counting the bucket an insert is about to take
+        (keep it at or below 0.5 so quadratic probing over a prime
+        capacity always finds a free bucket); max_probe_length bounds
+        how far a probe may walk through tombstones before the table
+        is compacted.
+        With adaptive_hash, a probe that long through live entries is
+        taken for a hash flood, and the next put rehashes every key
+        with a new KeyedHash, which an attacker can't pick colliding
+        keys for.
         """
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
-        self._capacity = self._next_prime(capacity)
+        self._capacity = self._round_capacity(capacity)
         for _ in range(self._capacity):
             self._buckets.append(None)
 
         self._hash_function = function
         self._size = 0
 
+        # tombstones are tracked apart from live entries so that
+        # churn-heavy workloads can't silently fill up the table
+        self._tombstones = 0
+        self._max_occupancy = max_occupancy
+        self._max_probe_length = max_probe_length
+        self._compact_pending = False
+
+        self._adaptive_hash = adaptive_hash
+        self._flood_pending = False
+        self._hash_switches = 0
+
+        # a WeakSet of the snapshots sharing the bucket array, or None
+        # before the first snapshot; see snapshot()
+        self._snapshots = None
+
+        # with incremental_resize a resize only allocates the new
+        # bucket array; each later put/get/remove moves the entries
+        # of migrate_batch old buckets across until none are left
+        self._incremental_resize = incremental_resize
+        self._migrate_batch = migrate_batch
+        self._old_buckets = None
+        self._migrate_index = 0
+
+        # bumped on every insert, removal and resize so iterators
+        # can tell that the map changed under them
+        self._mod_count = 0
+
+        # a MapStats while statistics are enabled, None otherwise
+        self._stats = None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -37,35 +101,29 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number to find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
+        return is_prime(capacity)
 
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
+    def _round_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity to use for a requested capacity.
+        Quadratic probing needs a prime to reach half the buckets.
+        """
+        return self._next_prime(capacity)
 
-        return True
+    def _grow_capacity(self, capacity: int) -> int:
+        """
+        Return the capacity to grow to from capacity: the prime from
+        the precomputed growth table at or above twice capacity.
+        """
+        return grow_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -83,48 +141,213 @@ class HashMap:
 
     # ------------------------------------------------------------------ #
 
+    def _find_index(self, key: str, hash: int, buckets: DynamicArray) -> int:
+        """
+        Quadratic probe the given bucket array for a live entry
+        with the given key and hash.
+        Return its bucket index, or -1 if the key is not found.
+        Tombstones are skipped; a long walk through them flags the
+        table for compaction on the next put.
+        """
+        capacity = buckets.length()
+        index = hash % capacity
+        growth = self._step_growth
+
+        hash_entry = buckets.get_at_index(index)
+        quad_index = 1
+        step = 1
+        skipped = 0
+        while hash_entry is not None:
+            if hash_entry.is_tombstone:
+                skipped += 1
+            # cached hashes are compared first; keys only on a match
+            elif hash_entry.hash == hash and hash_entry.key == key:
+                if self._stats is not None:
+                    self._stats.record_probes(quad_index)
+                return index
+            index = (index + step) % capacity
+            step += growth
+            quad_index += 1
+            hash_entry = buckets.get_at_index(index)
+
+        if self._stats is not None:
+            self._stats.record_probes(quad_index)
+        if buckets is self._buckets:
+            self._note_probe(quad_index, skipped)
+        return -1
+
+    def _locate(self, key: str) -> (DynamicArray, int):
+        """
+        Find the live entry for key, hashing it only once.
+        Return the bucket array holding it and its index there,
+        or an index of -1 if the key is not found. While an
+        incremental resize is running the entry may still be
+        in the old bucket array.
+        """
+        hash = self._hash_function(key)
+        index = self._find_index(key, hash, self._buckets)
+        if index == -1 and self._old_buckets is not None:
+            return (self._old_buckets,
+                    self._find_index(key, hash, self._old_buckets))
+        return self._buckets, index
+
+    def _note_probe(self, probes: int, skipped: int) -> None:
+        """
+        Flag the table for compaction when a probe ran past
+        max_probe_length and at least half of it was spent
+        stepping over tombstones. With adaptive_hash, flag a hash
+        flood when it was spent stepping over live entries instead.
+        """
+        if probes <= self._max_probe_length:
+            return
+        if 2 * skipped >= probes:
+            self._compact_pending = True
+        elif self._adaptive_hash:
+            function = self._hash_function
+            if self._stats is not None:
+                function = self._stats.function
+            if not isinstance(function, KeyedHash):
+                self._flood_pending = True
+
+    def _make_room(self) -> None:
+        """
+        Grow or compact the table before an insert, so that with the
+        bucket the insert may take the table stays within
+        max_occupancy.
+        Grow when live entries would go past max_occupancy.
+        Compact in place when tombstones would push the occupied share
+        of buckets past max_occupancy, or when a long probe was seen,
+        unless live entries alone fill half of the allowed share,
+        in which case growing avoids compacting again right away.
+        A flagged hash flood switches the map to a KeyedHash first.
+        """
+        if self._flood_pending:
+            self._hash_switches += 1
+            self.set_hash_function(KeyedHash())
+
+        capacity = self.get_capacity()
+        occupied = (self._size + self._tombstones + 1) / capacity
+        if (self._size + 1) / capacity > self._max_occupancy:
+            self._resize(self._grow_capacity(capacity))
+        elif occupied > self._max_occupancy or self._compact_pending:
+            if self.table_load() >= self._max_occupancy / 2:
+                self._resize(self._grow_capacity(capacity))
+            else:
+                self._resize(capacity)
+
+    def set_hash_function(self, function) -> None:
+        """
+        Rehash every key with function and use it from now on.
+        Unlike a resize, this calls the new function on every key.
+        """
+        self._finish_migration()
+        for idx in range(self.get_capacity()):
+            hash_entry = self._buckets.get_at_index(idx)
+            if hash_entry is not None and not hash_entry.is_tombstone:
+                hash_entry.hash = function(hash_entry.key)
+
+        if self._stats is not None:
+            self._stats.function = function
+        else:
+            self._hash_function = function
+        self._flood_pending = False
+        self._rehash(self.get_capacity())
+
     def put(self, key: str, value: object) -> None:
         """
         Resizes the table if load factor is equal to or above 0.5
         Update a key/value pair in the hash map.
         For existing key, update value.
         For new key, add key/value pair.
+        The first tombstone along the probe sequence is reused
+        for a new key.
         """
+        self._migrate_step()
+
         # remember, if the load factor is greater than or equal to 0.5,
         # resize the table before putting the new key/value pair
-        if self.table_load() >= 0.5:
-            new_capacity = 2 * self.get_capacity()
-            self.resize_table(new_capacity)
+        self._make_room()
 
         # hashing the key to get dynamic array index
-        hash = self._hash_function(key)
-        index = hash % self.get_capacity()
-        initial_index = index
+        self._put_hashed(key, value, self._hash_function(key))
+
+    def _put_hashed(self, key: str, value: object, hash: int,
+                    overwrite: bool = True) -> HashEntry:
+        """
+        Insert or update key, whose hash is already known.
+        If the key exists and overwrite is False its value is kept.
+        Returns the key's entry.
+        The caller makes sure the table has room.
+        """
+        capacity = self.get_capacity()
+        index = hash % capacity
+        growth = self._step_growth
 
-        # quadratic probe until there's no collision
+        # quadratic probe until we hit None, remembering the first
+        # tombstone in case the key turns out to be new
         hash_entry = self._buckets.get_at_index(index)
+        tombstone_index = -1
         quad_index = 1
-        while hash_entry is not None and not hash_entry.is_tombstone:
+        step = 1
+        skipped = 0
+        while hash_entry is not None:
+            if hash_entry.is_tombstone:
+                skipped += 1
+                if tombstone_index == -1:
+                    tombstone_index = index
             # check for duplicate key
-            if hash_entry.key == key:
-                hash_entry.value = value
-                return
+            elif hash_entry.hash == hash and hash_entry.key == key:
+                if self._stats is not None:
+                    self._stats.record_probes(quad_index)
+                # the caller may change the entry's value, so preserve
+                # the bucket even if overwrite is False
+                if self._snapshots is not None:
+                    self._preserve(self._buckets, index)
+                if overwrite:
+                    hash_entry.value = value
+                return hash_entry
             # quadratic probing
-            index = (initial_index + quad_index ** 2) % self.get_capacity()
+            index = (index + step) % capacity
+            step += growth
             quad_index += 1
             hash_entry = self._buckets.get_at_index(index)
 
-        # exit while loop once a space is available
-        if hash_entry is None:
-            new_hash_entry = HashEntry(key, value)
-            self._buckets.set_at_index(index, new_hash_entry)
-            self._size += 1
-        elif hash_entry.is_tombstone:
-            new_hash_entry = HashEntry(key, value)
-            self._buckets.set_at_index(index, new_hash_entry)
-            self._size += 1
+        if self._stats is not None:
+            self._stats.record_probes(quad_index)
+        self._note_probe(quad_index, skipped)
 
+        # the key may not have been migrated out of the old table yet
+        if self._old_buckets is not None:
+            old_index = self._find_index(key, hash, self._old_buckets)
+            if old_index != -1:
+                hash_entry = self._old_buckets.get_at_index(old_index)
+                if overwrite:
+                    hash_entry.value = value
+                return hash_entry
 
+        # exit while loop once a space is available
+        if tombstone_index != -1:
+            if self._snapshots is not None:
+                self._preserve(self._buckets, tombstone_index)
+            hash_entry = self._buckets.get_at_index(tombstone_index)
+            hash_entry.key = key
+            hash_entry.value = value
+            hash_entry.hash = hash
+            hash_entry.is_tombstone = False
+            self._tombstones -= 1
+        else:
+            if self._snapshots is not None:
+                self._preserve(self._buckets, index)
+            hash_entry = entry_pool.acquire()
+            if hash_entry is None:
+                hash_entry = HashEntry(key, value, hash)
+            else:
+                hash_entry.key, hash_entry.value, hash_entry.hash = (
+                    key, value, hash)
+            self._buckets.set_at_index(index, hash_entry)
+        self._size += 1
+        self._mod_count += 1
+        return hash_entry
 
     def table_load(self) -> float:
         """
@@ -135,87 +358,181 @@ class HashMap:
     def empty_buckets(self) -> int:
         """
         Returns the number of empty buckets in the hash table.
+        Tombstones count as empty, and every live entry, including
+        those still waiting in the old array during an incremental
+        resize, takes exactly one bucket of the current array; so
+        no scan of the table is needed.
         """
-        empty_count = 0
-        for idx in range(self._buckets.length()):
-            hash_entry = self._buckets.get_at_index(idx)
-            if hash_entry is None:
-                empty_count += 1
-            elif hash_entry.is_tombstone:
-                empty_count += 1
-
-        return empty_count
+        return self.get_capacity() - self.get_size()
 
     def resize_table(self, new_capacity: int) -> None:
         """
         Change the capacity of the hash table.
         Rehash all hash table links.
+        The capacity keeps doubling until every live entry fits under
+        max_occupancy, as it would if each entry were put again.
+        Always rehashes in one go, even with incremental_resize set.
         """
         if new_capacity < self.get_size():
             return
-        elif not self._is_prime(new_capacity):
-            new_capacity = self._next_prime(new_capacity)
-            self._capacity = new_capacity
-        else:
-            self._capacity = new_capacity
 
+        self._finish_migration()
+        self._rehash(self._fit_capacity(new_capacity))
+
+    def _fit_capacity(self, new_capacity: int, count: int = None) -> int:
+        """
+        Round new_capacity up to a valid capacity, doubling it until
+        count entries (every live entry by default) fit under
+        max_occupancy.
+        """
+        if count is None:
+            count = self.get_size()
+        new_capacity = self._round_capacity(new_capacity)
+
+        while count / new_capacity > self._max_occupancy:
+            new_capacity = self._grow_capacity(new_capacity)
+
+        return new_capacity
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resize triggered by put().
+        With incremental_resize the new bucket array is only
+        allocated here; entries move over a few buckets at a time
+        in _migrate_step(). Otherwise the table is rehashed at once.
+        """
+        new_capacity = self._fit_capacity(new_capacity)
+        if not self._incremental_resize or self._snapshots:
+            self._rehash(new_capacity)
+            return
+
+        self._finish_migration()
+        if self._stats is not None:
+            self._stats.record_resize(0.0)
+        self._old_buckets = self._buckets
+        self._migrate_index = 0
+        self._mod_count += 1
+
+        self._capacity = new_capacity
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._tombstones = 0
+        self._compact_pending = False
+
+        self._migrate_step()
+
+    def _migrate_step(self) -> None:
+        """
+        Move the live entries of the next migrate_batch buckets of
+        the old bucket array into the new one.
+        A moved entry leaves the _MIGRATED tombstone behind so the
+        probe paths of entries still waiting in the old array stay
+        intact.
+        """
+        if self._old_buckets is None:
+            return
+        if self._stats is not None:
+            start = perf_counter()
+
+        old_da = self._old_buckets
+        stop = min(self._migrate_index + self._migrate_batch, old_da.length())
+        for idx in range(self._migrate_index, stop):
+            hash_entry = old_da.get_at_index(idx)
+            if hash_entry is None or hash_entry is _MIGRATED:
+                continue
+            if hash_entry.is_tombstone:
+                entry_pool.release(hash_entry)
+            else:
+                self._place(hash_entry)
+            old_da.set_at_index(idx, _MIGRATED)
+
+        self._migrate_index = stop
+        if stop == old_da.length():
+            self._old_buckets = None
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start, started=False)
+
+    def _finish_migration(self) -> None:
+        """Move everything still left in the old bucket array."""
+        while self._old_buckets is not None:
+            self._migrate_step()
+
+    def _place(self, hash_entry: HashEntry) -> None:
+        """
+        Put an entry known not to be in the table into the first
+        empty bucket or tombstone on its probe path, by its
+        cached hash code.
+        """
+        capacity = self._buckets.length()
+        index = hash_entry.hash % capacity
+        growth = self._step_growth
+        step = 1
+        current = self._buckets.get_at_index(index)
+        while current is not None and not current.is_tombstone:
+            index = (index + step) % capacity
+            step += growth
+            current = self._buckets.get_at_index(index)
+
+        if current is not None:
+            self._tombstones -= 1
+        self._buckets.set_at_index(index, hash_entry)
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Move every live entry into a new bucket array of new_capacity
+        in a single pass.
+        Entries are moved, not copied, and placed by their cached
+        hash code; tombstones are dropped. The new table holds no
+        duplicates, so each entry just takes the first empty bucket
+        on its probe path. Snapshots sharing the old array copy what
+        they still need from it first.
+        """
+        if self._stats is not None:
+            start = perf_counter()
         old_da = self._buckets
-        self.clear()
+        self._detach_snapshots()
+
+        self._capacity = new_capacity
+        self._buckets = DynamicArray([None] * new_capacity)
+        self._tombstones = 0
+        self._compact_pending = False
+        self._mod_count += 1
 
         for idx in range(old_da.length()):
             hash_entry = old_da.get_at_index(idx)
-            if hash_entry is not None and not hash_entry.is_tombstone:
-                self.put(hash_entry.key, hash_entry.value)
+            if hash_entry is None:
+                continue
+            if not hash_entry.is_tombstone:
+                self._place(hash_entry)
+            elif hash_entry is not _MIGRATED:
+                entry_pool.release(hash_entry)
+
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
 
     def get(self, key: str) -> object:
         """
         Returns the value corresponding with the given key.
         Return none if the key is not found.
         """
+        self._migrate_step()
         if self.get_size() == 0:
             return None
 
-        hash = self._hash_function(key)
-        index = hash % self.get_capacity()
-        initial_index = index
-
-        # quadratic probe until we hit None or a matching entry
-        hash_entry = self._buckets.get_at_index(index)
-        quad_index = 1
-        while hash_entry is not None:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                return hash_entry.value
-            index = (initial_index + quad_index ** 2) % self.get_capacity()
-            quad_index += 1
-            hash_entry = self._buckets.get_at_index(index)
-
-        return None
+        buckets, index = self._locate(key)
+        if index == -1:
+            return None
+        return buckets.get_at_index(index).value
 
     def contains_key(self, key: str) -> bool:
         """
         Returns true if the given key is in the hash map.
         Otherwise, returns false.
         """
+        self._migrate_step()
         if self.get_size() == 0:
             return False
 
-        hash = self._hash_function(key)
-        index = hash % self.get_capacity()
-        initial_index = index
-
-        # quadratic probe until we hit None or a matching entry
-        hash_entry = self._buckets.get_at_index(index)
-        quad_index = 1
-        while hash_entry is not None:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                return True
-            elif hash_entry.key == key and hash_entry.is_tombstone:
-                return False
-            index = (initial_index + quad_index ** 2) % self.get_capacity()
-            quad_index += 1
-            hash_entry = self._buckets.get_at_index(index)
-
-        return False
+        return self._locate(key)[1] != -1
 
     def remove(self, key: str) -> None:
         """
@@ -223,28 +540,26 @@ class HashMap:
         Doesn't actually delete the pair, only sets is_tombstone to true.
         If key is not found, does nothing.
         """
+        self._migrate_step()
         if self.get_size() == 0:
             return
 
-        hash = self._hash_function(key)
-        index = hash % self.get_capacity()
-        initial_index = index
+        buckets, index = self._locate(key)
+        if index == -1:
+            return
 
-        # quadratic probe until we hit None or a matching entry
-        hash_entry = self._buckets.get_at_index(index)
-        quad_index = 1
-        while hash_entry is not None:
-            if hash_entry.key == key and not hash_entry.is_tombstone:
-                hash_entry.is_tombstone = True
-                self._size -= 1
-                return
-            elif hash_entry.key == key and hash_entry.is_tombstone:
-                return
-            index = (initial_index + quad_index ** 2) % self.get_capacity()
-            quad_index += 1
-            hash_entry = self._buckets.get_at_index(index)
+        self._delete(buckets, index)
+        self._size -= 1
+        self._mod_count += 1
 
-        return
+    def _delete(self, buckets: DynamicArray, index: int) -> None:
+        """Turn the live entry at index of buckets into a tombstone."""
+        if self._snapshots is not None:
+            self._preserve(buckets, index)
+        buckets.get_at_index(index).is_tombstone = True
+        # tombstones left in the old table are dropped by the migration
+        if buckets is self._buckets:
+            self._tombstones += 1
 
     def clear(self) -> None:
         """
@@ -252,6 +567,12 @@ class HashMap:
         Does not change the hash table capacity.
         """
         self._size = 0
+        self._tombstones = 0
+        self._compact_pending = False
+        self._old_buckets = None
+        self._mod_count += 1
+        # snapshots keep the old bucket array to themselves
+        self._snapshots = None
         self._buckets = DynamicArray()
         for _ in range(self._capacity):
             self._buckets.append(None)
@@ -263,12 +584,474 @@ class HashMap:
         """
         tuples_da = DynamicArray()
 
-        for idx in range(self._buckets.length()):
-            hash_entry = self._buckets.get_at_index(idx)
-            if hash_entry is not None:
-                if not hash_entry.is_tombstone:
-                    tuples_da.append((hash_entry.key, hash_entry.value))
+        for buckets in (self._buckets, self._old_buckets):
+            if buckets is None:
+                continue
+            for idx in range(buckets.length()):
+                hash_entry = buckets.get_at_index(idx)
+                if hash_entry is not None:
+                    if not hash_entry.is_tombstone:
+                        tuples_da.append((hash_entry.key, hash_entry.value))
 
         return tuples_da
 
+    # ------------------------------------------------------------------ #
+
+    def _upsert(self, key: str, default: object) -> HashEntry:
+        """
+        Return the entry for key, adding it with value default
+        first if it is missing. Hashes and probes the key once.
+        """
+        self._migrate_step()
+        self._make_room()
+        return self._put_hashed(key, default, self._hash_function(key),
+                                overwrite=False)
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Receives a key and a default value.
+        If the key is missing, adds it with the default value.
+        Returns the value now stored for the key.
+        """
+        return self._upsert(key, default).value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Receives a key and an amount.
+        Adds delta to the key's value, treating a missing key as 0.
+        Returns the new value.
+        """
+        hash_entry = self._upsert(key, 0)
+        hash_entry.value += delta
+        return hash_entry.value
+
+    def update_with(self, key: str, function, default: object = None) -> object:
+        """
+        Receives a key, a function of one argument and a default value.
+        Replaces the key's value with function(value), using default
+        as the value of a missing key.
+        Returns the new value.
+        """
+        hash_entry = self._upsert(key, default)
+        hash_entry.value = function(hash_entry.value)
+        return hash_entry.value
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable (or DynamicArray) of (key, value) tuples.
+        Puts every pair, as put() would one by one, but sizes the
+        table once for the whole batch and hashes all keys up front.
+        """
+        pairs = to_list(pairs)
+        if not pairs:
+            return
+
+        self._finish_migration()
+        count = self._size + self._tombstones + len(pairs)
+        if count / self.get_capacity() > self._max_occupancy:
+            self._rehash(self._fit_capacity(self.get_capacity(),
+                                            self._size + len(pairs)))
+
+        hash_function = self._hash_function
+        hashes = [hash_function(key) for key, _ in pairs]
+        for position, ((key, value), hash) in enumerate(zip(pairs, hashes)):
+            self._put_hashed(key, value, hash)
+            if self._flood_pending:
+                # the rest were hashed with the old function
+                self._make_room()
+                self.put_many(pairs[position + 1:])
+                return
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Returns a dynamic array with the value of each key, in the
+        same order, holding None for keys that are not found.
+        """
+        self._migrate_step()
+        values_da = DynamicArray()
+        for key in to_list(keys):
+            buckets, index = self._locate(key)
+            if index == -1:
+                values_da.append(None)
+            else:
+                values_da.append(buckets.get_at_index(index).value)
+
+        return values_da
+
+    def remove_many(self, keys) -> int:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Removes each key that is found.
+        Returns the number of keys removed.
+        """
+        self._migrate_step()
+        removed = 0
+        for key in to_list(keys):
+            buckets, index = self._locate(key)
+            if index == -1:
+                continue
+            self._delete(buckets, index)
+            removed += 1
+
+        self._size -= removed
+        self._mod_count += removed
+        return removed
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
+        """
+        Start collecting statistics: probes per lookup, resize count
+        and duration, and time spent in the hash function.
+        Counters start from zero; enabling them again resets them.
+        """
+        self.disable_stats()
+        self._stats = MapStats(self._hash_function)
+        self._hash_function = self._stats.timed_hash
+
+    def disable_stats(self) -> None:
+        """Stop collecting statistics and drop the counters."""
+        if self._stats is not None:
+            self._hash_function = self._stats.function
+            self._stats = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the map's statistics as a dict.
+        Size, capacity, load, empty buckets and tombstones are always
+        reported; the operation counters (see enable_stats) only
+        while statistics are enabled. probe_histogram maps a probe
+        length to the number of lookups that took that many probes.
+        hash_switches counts the hash functions adaptive_hash replaced.
+        """
+        snapshot = {
+            'size': self.get_size(),
+            'capacity': self.get_capacity(),
+            'table_load': self.table_load(),
+            'empty_buckets': self.empty_buckets(),
+            'tombstones': self._tombstones,
+            'hash_switches': self._hash_switches,
+        }
+        if self._stats is not None:
+            snapshot.update(self._stats.snapshot())
+        return snapshot
+
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> ProbeSnapshot:
+        """
+        Returns a read-only view of the map as it is now, in O(1).
+        The view shares the map's buckets; the map has it copy a
+        bucket just before it first changes it, and copy the rest
+        before a resize, so later writes never show through.
+        """
+        self._finish_migration()
+        function = self._hash_function
+        if self._stats is not None:
+            function = self._stats.function
+
+        view = ProbeSnapshot(self._buckets, self._size, function,
+                             self._step_growth)
+        if self._snapshots is None:
+            self._snapshots = weakref.WeakSet()
+        self._snapshots.add(view)
+        return view
+
+    def _preserve(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Have every live snapshot copy bucket index of buckets before
+        the map changes it.
+        """
+        snapshots = self._snapshots
+        if not snapshots:
+            self._snapshots = None
+            return
+        for view in list(snapshots):
+            view.preserve(buckets, index)
+
+    def _detach_snapshots(self) -> None:
+        """
+        Have every live snapshot copy the buckets it still shares
+        with the map, before the map moves the entries elsewhere.
+        """
+        if self._snapshots:
+            for view in list(self._snapshots):
+                view.detach(self._buckets)
+        self._snapshots = None
+
+    def __getstate__(self) -> dict:
+        """Pickle the map without its snapshots."""
+        state = self.__dict__.copy()
+        state['_snapshots'] = None
+        return state
+
+    # ------------------------------------------------------------------ #
+
+    def _options(self) -> dict:
+        """Return the constructor arguments save() keeps with the map."""
+        return {
+            'max_occupancy': self._max_occupancy,
+            'max_probe_length': self._max_probe_length,
+            'incremental_resize': self._incremental_resize,
+            'migrate_batch': self._migrate_batch,
+            'adaptive_hash': self._adaptive_hash,
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Write the map to path in the binary format of hash_map_file:
+        capacity, hash function id and every bucket in order, cached
+        hashes and tombstones included. The hash function must have
+        an id there (see hash_map_file.register_hash_function).
+        """
+        self._finish_migration()
+        function = self._hash_function
+        if self._stats is not None:
+            function = self._stats.function
+
+        def buckets():
+            for idx in range(self.get_capacity()):
+                hash_entry = self._buckets.get_at_index(idx)
+                if hash_entry is None:
+                    yield []
+                elif hash_entry.is_tombstone:
+                    yield TOMBSTONE
+                else:
+                    yield [(hash_entry.hash, hash_entry.key, hash_entry.value)]
+
+        write_map(path, self._step_growth, self.get_capacity(),
+                  self.get_size(), self._tombstones, function,
+                  self._options(), buckets())
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        Return a new map read from a file written by save() on a map
+        of the same class.
+        Entries and tombstones go straight back into their saved
+        buckets without calling the hash function.
+        """
+        header, buckets = read_map(path)
+        if header['step_growth'] != cls._step_growth:
+            raise HashMapFileError(path + ' was not saved by a ' + cls.__name__)
+
+        hash_map = cls(header['capacity'], header['function'],
+                       **header['options'])
+        if hash_map.get_capacity() != header['capacity']:
+            raise HashMapFileError(path + ' has an invalid capacity')
+        for idx, bucket in enumerate(buckets):
+            if bucket is TOMBSTONE:
+                hash_entry = HashEntry(None, None)
+                hash_entry.is_tombstone = True
+            elif bucket:
+                hash, key, value = bucket[0]
+                hash_entry = HashEntry(key, value, hash)
+            else:
+                continue
+            hash_map._buckets.set_at_index(idx, hash_entry)
+        hash_map._size = header['size']
+        hash_map._tombstones = header['tombstones']
+        return hash_map
+
+    # ------------------------------------------------------------------ #
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map, one at
+        a time, without building a copy of the table.
+        Raises RuntimeError if the map is resized or has keys added
+        or removed while the iteration is running.
+        """
+        self._finish_migration()
+        expected = self._mod_count
+        buckets = self._buckets
+        for idx in range(buckets.length()):
+            hash_entry = buckets.get_at_index(idx)
+            if hash_entry is None or hash_entry.is_tombstone:
+                continue
+            yield hash_entry.key, hash_entry.value
+            if self._mod_count != expected:
+                raise RuntimeError('HashMap changed size during iteration')
+
+    def keys(self):
+        """Yield each key stored in the hash map, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the hash map, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+
+class TriangularHashMap(HashMap):
+    """
+    HashMap that probes with triangular numbers (offsets 1, 3, 6, ...)
+    over a power-of-two capacity.
+    That sequence visits every bucket before repeating, so capacities
+    need not be prime and each probe step is a single addition.
+    """
+
+    _step_growth = 1
+
+    def _round_capacity(self, capacity: int) -> int:
+        """Return the smallest power of two at or above capacity."""
+        return 1 << max(capacity - 1, 1).bit_length()
+
+    def _grow_capacity(self, capacity: int) -> int:
+        """Return the power of two twice capacity."""
+        return self._round_capacity(2 * capacity)
+
+
+class RobinHoodHashMap(HashMap):
+    """
+    HashMap that uses linear probing with Robin Hood displacement:
+    an insert takes over any bucket whose entry sits closer to its
+    home bucket than the new entry would, which keeps probe lengths
+    short and even. Removal shifts the following entries back one
+    bucket instead of leaving a tombstone, so there are no
+    tombstones to clean up.
+    Incremental resizing is not supported.
+    """
+
+    _step_growth = 0
+
+    def __init__(self, capacity: int, function,
+                 max_occupancy: float = 0.5, **kwargs) -> None:
+        """
+        Initialize new RobinHoodHashMap.
+        Linear probing always finds a free bucket, so max_occupancy
+        may go well above 0.5 (0.8 or 0.9 is typical).
+        """
+        if kwargs.get('incremental_resize'):
+            raise ValueError('RobinHoodHashMap does not support '
+                             'incremental_resize')
+        super().__init__(capacity, function, max_occupancy, **kwargs)
+
+    @staticmethod
+    def _distance(index: int, hash: int, capacity: int) -> int:
+        """Return how far index is from the home bucket of hash."""
+        return (index - hash % capacity) % capacity
+
+    def _find_index(self, key: str, hash: int, buckets: DynamicArray) -> int:
+        """
+        Linear probe for key, stopping early at the first entry that
+        is closer to its home bucket than key would be, since key
+        would have displaced it.
+        Return the key's bucket index, or -1 if the key is not found.
+        """
+        capacity = buckets.length()
+        index = hash % capacity
+        distance = 0
+        hash_entry = buckets.get_at_index(index)
+        while hash_entry is not None:
+            if hash_entry.hash == hash and hash_entry.key == key:
+                break
+            if self._distance(index, hash_entry.hash, capacity) < distance:
+                hash_entry = None
+                break
+            index = (index + 1) % capacity
+            distance += 1
+            hash_entry = buckets.get_at_index(index)
+
+        if self._stats is not None:
+            self._stats.record_probes(distance + 1)
+        return -1 if hash_entry is None else index
+
+    def _put_hashed(self, key: str, value: object, hash: int,
+                    overwrite: bool = True) -> HashEntry:
+        """
+        Insert or update key, whose hash is already known.
+        If the key exists and overwrite is False its value is kept.
+        Returns the key's entry.
+        """
+        capacity = self.get_capacity()
+        index = hash % capacity
+        distance = 0
+        hash_entry = self._buckets.get_at_index(index)
+        while hash_entry is not None:
+            if hash_entry.hash == hash and hash_entry.key == key:
+                if self._stats is not None:
+                    self._stats.record_probes(distance + 1)
+                if self._snapshots is not None:
+                    self._preserve(self._buckets, index)
+                if overwrite:
+                    hash_entry.value = value
+                return hash_entry
+            if self._distance(index, hash_entry.hash, capacity) < distance:
+                break
+            index = (index + 1) % capacity
+            distance += 1
+            hash_entry = self._buckets.get_at_index(index)
+
+        if self._stats is not None:
+            self._stats.record_probes(distance + 1)
+        self._note_probe(distance + 1, 0)
+        hash_entry = entry_pool.acquire()
+        if hash_entry is None:
+            hash_entry = HashEntry(key, value, hash)
+        else:
+            hash_entry.key, hash_entry.value, hash_entry.hash = (
+                key, value, hash)
+        self._displace(hash_entry, index, distance)
+        self._size += 1
+        self._mod_count += 1
+        return hash_entry
+
+    def _place(self, hash_entry: HashEntry) -> None:
+        """Insert an entry known not to be in the table."""
+        self._displace(hash_entry,
+                       hash_entry.hash % self.get_capacity(), 0)
+
+    def _displace(self, hash_entry: HashEntry, index: int,
+                  distance: int) -> None:
+        """
+        Put hash_entry, which is distance buckets past its home, at
+        index. Whatever entry it displaces moves on down the table,
+        taking over the next bucket whose entry is closer to home.
+        """
+        capacity = self.get_capacity()
+        buckets = self._buckets
+        current = buckets.get_at_index(index)
+        while current is not None:
+            current_distance = self._distance(index, current.hash, capacity)
+            if current_distance < distance:
+                if self._snapshots is not None:
+                    self._preserve(buckets, index)
+                buckets.set_at_index(index, hash_entry)
+                hash_entry, distance = current, current_distance
+            index = (index + 1) % capacity
+            distance += 1
+            current = buckets.get_at_index(index)
+
+        if self._snapshots is not None:
+            self._preserve(buckets, index)
+        buckets.set_at_index(index, hash_entry)
+
+    def _delete(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Remove the entry at index and shift each following entry
+        that isn't in its home bucket back by one.
+        """
+        capacity = buckets.length()
+        if self._snapshots is not None:
+            self._preserve(buckets, index)
+        entry_pool.release(buckets.get_at_index(index))
+
+        next_index = (index + 1) % capacity
+        hash_entry = buckets.get_at_index(next_index)
+        while (hash_entry is not None and
+               self._distance(next_index, hash_entry.hash, capacity) > 0):
+            buckets.set_at_index(index, hash_entry)
+            index = next_index
+            if self._snapshots is not None:
+                self._preserve(buckets, index)
+            next_index = (index + 1) % capacity
+            hash_entry = buckets.get_at_index(next_index)
 
+        buckets.set_at_index(index, None)
@@ -0,0 +1,280 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Insertion-ordered open addressing hash map laid out like
+#              CPython's dict: a small sparse index into dense entry arrays
+
+
+from array import array
+
+from a6_include import DynamicArray
+
+# index slot states; any other value is the number of an entry
+FREE = -1
+DUMMY = -2
+
+_MASK_64 = (1 << 64) - 1
+
+# CPython's probe: the high bits of the hash are shifted in this many
+# at a time, after which 5 * slot + 1 visits every slot
+_PERTURB_SHIFT = 5
+
+
+def _index_array(capacity: int) -> array:
+    """
+    Return an index of capacity FREE slots, using the smallest signed
+    integer type able to hold every entry number below capacity.
+    """
+    for typecode in 'bhiq':
+        if capacity <= 1 << (8 * array(typecode).itemsize - 1):
+            return array(typecode, [FREE]) * capacity
+    raise OverflowError('capacity ' + str(capacity) + ' is too large')
+
+
+class OrderedHashMap:
+    """
+    Open addressing hash map that remembers insertion order.
+    Entries (cached hash code, key, value) are appended to three
+    dense lists in the order their keys were added; the hash table
+    itself is only an index of entry numbers, one to eight bytes
+    each depending on the capacity. So iteration visits entries in
+    insertion order and costs time proportional to the number of
+    entries, and a sparse table costs a few bytes per empty slot
+    instead of a pointer.
+    A removed key leaves a dummy in the index and a hole in the
+    entries; holes are squeezed out whenever the index is rebuilt,
+    and as soon as they outnumber live entries.
+    Updating the value of an existing key keeps its position.
+    Supports the same methods as hash_map_oa.HashMap.
+    """
+
+    def __init__(self, capacity: int, function,
+                 max_occupancy: float = 2 / 3) -> None:
+        """
+        Initialize new OrderedHashMap with an index of at least
+        capacity slots (a power of two).
+        The index is rebuilt once entries, holes included, fill
+        max_occupancy of it.
+        """
+        self._hash_function = function
+        self._max_occupancy = max_occupancy
+        self._allocate(self._round_capacity(capacity))
+        self._hashes = []
+        self._keys = []
+        self._values = []
+        self._size = 0
+        self._holes = 0
+
+        # bumped on every insert, removal and rebuild so iterators
+        # can tell that the map changed under them
+        self._mod_count = 0
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for number in range(len(self._keys)):
+            if self._hashes[number] is not None:
+                out += (str(number) + ': K: ' + str(self._keys[number]) +
+                        ' V: ' + str(self._values[number]) + '\n')
+        return out
+
+    @staticmethod
+    def _round_capacity(capacity: int) -> int:
+        """Return the smallest power of two, at least 8, at or above capacity."""
+        return max(8, 1 << max(capacity - 1, 1).bit_length())
+
+    def _fit_capacity(self, count: int) -> int:
+        """Return the smallest capacity whose index has room for count entries."""
+        capacity = 8
+        while int(capacity * self._max_occupancy) < count:
+            capacity *= 2
+        return capacity
+
+    def _allocate(self, capacity: int) -> None:
+        """Replace the index with an empty one of capacity slots."""
+        self._capacity = capacity
+        self._usable = int(capacity * self._max_occupancy)
+        self._index = _index_array(capacity)
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def table_load(self) -> float:
+        """Returns the hash table load factor."""
+        return self._size / self._capacity
+
+    def empty_buckets(self) -> int:
+        """Returns the number of index slots not holding a live entry."""
+        return self._capacity - self._size
+
+    # ------------------------------------------------------------------ #
+
+    def _find(self, key: str, hash: int) -> int:
+        """
+        Probe the index for key.
+        Return its index slot, or -1 if the key is not found.
+        """
+        index, hashes, keys = self._index, self._hashes, self._keys
+        mask = self._capacity - 1
+        perturb = hash & _MASK_64
+        slot = perturb & mask
+        while True:
+            number = index[slot]
+            if number == FREE:
+                return -1
+            if (number >= 0 and hashes[number] == hash
+                    and keys[number] == key):
+                return slot
+            perturb >>= _PERTURB_SHIFT
+            slot = (5 * slot + perturb + 1) & mask
+
+    def _free_slot(self, hash: int) -> int:
+        """Return the first free or dummy index slot on hash's probe path."""
+        index = self._index
+        mask = self._capacity - 1
+        perturb = hash & _MASK_64
+        slot = perturb & mask
+        while index[slot] >= 0:
+            perturb >>= _PERTURB_SHIFT
+            slot = (5 * slot + perturb + 1) & mask
+        return slot
+
+    def _rebuild(self, capacity: int) -> None:
+        """
+        Squeeze the holes out of the entries, keeping their order,
+        and index them again in a new index of capacity slots.
+        """
+        live = [number for number in range(len(self._keys))
+                if self._hashes[number] is not None]
+        self._hashes = [self._hashes[number] for number in live]
+        self._keys = [self._keys[number] for number in live]
+        self._values = [self._values[number] for number in live]
+        self._holes = 0
+        self._mod_count += 1
+
+        self._allocate(capacity)
+        index = self._index
+        for number, hash in enumerate(self._hashes):
+            index[self._free_slot(hash)] = number
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """
+        Update a key/value pair in the hash map.
+        For existing key, update value, keeping the key's position.
+        For new key, add key/value pair after every other key.
+        """
+        hash = self._hash_function(key)
+        slot = self._find(key, hash)
+        if slot != -1:
+            self._values[self._index[slot]] = value
+            return
+
+        if len(self._keys) >= self._usable:
+            self._rebuild(self._fit_capacity(2 * self._size + 1))
+        self._index[self._free_slot(hash)] = len(self._keys)
+        self._hashes.append(hash)
+        self._keys.append(key)
+        self._values.append(value)
+        self._size += 1
+        self._mod_count += 1
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value corresponding with the given key.
+        Return none if the key is not found.
+        """
+        slot = self._find(key, self._hash_function(key))
+        if slot == -1:
+            return None
+        return self._values[self._index[slot]]
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns true if the given key is in the hash map.
+        Otherwise, returns false.
+        """
+        return self._find(key, self._hash_function(key)) != -1
+
+    def remove(self, key: str) -> None:
+        """
+        Removes the key/value pair of the given key.
+        If key is not found, does nothing.
+        """
+        slot = self._find(key, self._hash_function(key))
+        if slot == -1:
+            return
+
+        number = self._index[slot]
+        self._index[slot] = DUMMY
+        self._hashes[number] = self._keys[number] = self._values[number] = None
+        self._size -= 1
+        self._holes += 1
+        self._mod_count += 1
+        if self._holes > self._size:
+            self._rebuild(self._capacity)
+
+    def resize_table(self, new_capacity: int) -> None:
+        """
+        Change the capacity of the index, rounded up to a power of
+        two with room for every entry. Entries keep their order.
+        """
+        self._rebuild(max(self._round_capacity(new_capacity),
+                          self._fit_capacity(self._size)))
+
+    def clear(self) -> None:
+        """
+        Clear the content of the hash map.
+        Does not change the hash table capacity.
+        """
+        self._allocate(self._capacity)
+        self._hashes = []
+        self._keys = []
+        self._values = []
+        self._size = 0
+        self._holes = 0
+        self._mod_count += 1
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of tuples (key, value)
+        stored in the hash map, in insertion order
+        """
+        tuples_da = DynamicArray()
+        for pair in self.items():
+            tuples_da.append(pair)
+        return tuples_da
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map, one at
+        a time, in insertion order.
+        Raises RuntimeError if the map has keys added or removed
+        while the iteration is running.
+        """
+        expected = self._mod_count
+        hashes, keys, values = self._hashes, self._keys, self._values
+        for number in range(len(keys)):
+            if hashes[number] is not None:
+                yield keys[number], values[number]
+                if self._mod_count != expected:
+                    raise RuntimeError('HashMap changed size during iteration')
+
+    def keys(self):
+        """Yield each key stored in the hash map, in insertion order."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the hash map, in insertion order."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
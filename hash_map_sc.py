@@ -3,28 +3,106 @@
 # Description: Hash table implementation with separate chaining
 
 
-from a6_include import (DynamicArray, LinkedList,
+import weakref
+from time import perf_counter
+
+from a6_include import (DynamicArray, LinkedList, SLNode, to_list,
                         hash_function_1, hash_function_2)
+from chains import CHAIN_ORDERS, AdaptiveList
+from hash_functions import KeyedHash
+from hash_map_file import CHAINED, HashMapFileError, read_map, write_map
+from map_stats import MapStats
+from primes import grow_prime, is_prime, next_prime
+from snapshot import ChainSnapshot
+
+# find_mode counts integer input in a plain list when the values span
+# at most this many times the input length
+_COUNTING_SPAN = 2
+
+# with adaptive_hash, a chain longer than this (times max_load, if
+# above 1) is taken for a hash flood; a good hash function keeps even
+# a million keys well below it
+_FLOOD_CHAIN = 16
+
+# stands in for each chain of a new bucket array that an incremental
+# resize has not created yet; never handed out, so it stays empty
+_UNFILLED = LinkedList()
 
 class HashMap:
     def __init__(self,
                  capacity: int = 11,
-                 function: callable = hash_function_1) -> None:
+                 function: callable = hash_function_1,
+                 max_load: float = 1.0,
+                 min_load: float = 0.25,
+                 incremental_resize: bool = False,
+                 migrate_batch: int = 64,
+                 chain_order: str = None,
+                 treeify_threshold: int = None,
+                 adaptive_hash: bool = False) -> None:
         """
         Initialize new HashMap that uses
         separate chaining for collision resolution
-        DO NOT CHANGE THIS METHOD IN ANY WAY
+        The table doubles once the load factor goes above max_load and
+        halves once removals bring it below min_load, but never
+        shrinks below the initial capacity. Set min_load to 0 to
+        disable shrinking.
+        chain_order 'move_to_front' or 'transpose' moves a key found
+        by a lookup towards the front of its chain. A chain longer
+        than treeify_threshold is kept as a sorted array instead
+        (see chains.AdaptiveList).
+        With adaptive_hash, a chain growing past a flood limit makes
+        the map rehash every key with a new KeyedHash, which an
+        attacker can't pick colliding keys for.
         """
+        if chain_order is not None and chain_order not in CHAIN_ORDERS:
+            raise ValueError('unknown chain_order ' + repr(chain_order))
+        self._chain_order = chain_order
+        self._treeify_threshold = treeify_threshold
+
         self._buckets = DynamicArray()
 
         # capacity must be a prime number
         self._capacity = self._next_prime(capacity)
         for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+            self._buckets.append(self._new_list())
 
         self._hash_function = function
         self._size = 0
 
+        # chains of the bucket array holding at least one node, and
+        # while an incremental resize runs, those of the old array
+        # still waiting to move; so empty_buckets() needn't scan
+        self._nonempty = 0
+        self._waiting = 0
+
+        self._max_load = max_load
+        self._min_load = min_load
+        self._min_capacity = self._capacity
+
+        # with incremental_resize a resize only allocates the new
+        # bucket array; each later put/get/remove relinks the chains
+        # of migrate_batch old buckets until none are left
+        self._incremental_resize = incremental_resize
+        self._migrate_batch = migrate_batch
+        self._old_buckets = None
+        self._migrate_index = 0
+        self._fill_index = 0
+
+        # bumped on every insert, removal and resize so iterators
+        # can tell that the map changed under them
+        self._mod_count = 0
+
+        # a MapStats while statistics are enabled, None otherwise
+        self._stats = None
+
+        self._adaptive_hash = adaptive_hash
+        self._flood_chain = int(_FLOOD_CHAIN * max(1.0, max_load))
+        self._hash_switches = 0
+
+        # a WeakSet of the snapshots sharing the bucket array, or None
+        # before the first snapshot; see snapshot()
+        self._snapshots = None
+
     def __str__(self) -> str:
         """
         Override string method to provide more readable output
@@ -38,35 +116,15 @@ class HashMap:
     def _next_prime(self, capacity: int) -> int:
         """
         Increment from given number and the find the closest prime number
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity % 2 == 0:
-            capacity += 1
-
-        while not self._is_prime(capacity):
-            capacity += 2
-
-        return capacity
+        return next_prime(capacity)
 
     @staticmethod
     def _is_prime(capacity: int) -> bool:
         """
         Determine if given integer is a prime number and return boolean
-        DO NOT CHANGE THIS METHOD IN ANY WAY
         """
-        if capacity == 2 or capacity == 3:
-            return True
-
-        if capacity == 1 or capacity % 2 == 0:
-            return False
-
-        factor = 3
-        while factor ** 2 <= capacity:
-            if capacity % factor == 0:
-                return False
-            factor += 2
-
-        return True
+        return is_prime(capacity)
 
     def get_size(self) -> int:
         """
@@ -89,30 +147,125 @@ class HashMap:
         Updates key/value pairs in the hash map.
         If key exists, replace its value with the new value.
         If key does not exist, add the new key/value pair.
+        Doubles the table if the new pair pushes the load factor
+        above max_load.
         """
+        self._migrate_step()
         hash = self._hash_function(key)
-        index = hash % self.get_capacity()
+        if self._snapshots is not None:
+            self._preserve(hash)
 
         # if bucket already contains a node with matching key, modify node instead of inserting node
-        linked_list = self._buckets.get_at_index(index)
-        matching_node = linked_list.contains(key)
+        linked_list = self._bucket(hash)
+        matching_node = linked_list.contains(key, hash)
         if matching_node is not None:
             matching_node.value = value
         else:
-            linked_list.insert(key, value)
+            linked_list.insert(key, value, hash)
+            if linked_list.length() == 1:
+                self._count_chain(hash, 1)
             self._size += 1
+            self._mod_count += 1
+            self._check_flood(linked_list)
+            if self.table_load() > self._max_load:
+                self._resize(grow_prime(self.get_capacity()))
 
-    def empty_buckets(self) -> int:
+    def _check_flood(self, linked_list: LinkedList) -> bool:
         """
-        Return the number of empty buckets in the hash table.
+        With adaptive_hash, switch to a KeyedHash once a chain grows
+        past the flood limit, unless the map already uses one.
+        Return True if the hash function was switched.
+        """
+        if (not self._adaptive_hash
+                or linked_list.length() <= self._flood_chain):
+            return False
+        function = self._hash_function
+        if self._stats is not None:
+            function = self._stats.function
+        if isinstance(function, KeyedHash):
+            return False
+
+        self._hash_switches += 1
+        self.set_hash_function(KeyedHash())
+        return True
+
+    def set_hash_function(self, function) -> None:
         """
-        empty_count = 0
+        Rehash every key with function and use it from now on.
+        Unlike a resize, this calls the new function on every key.
+        """
+        self._finish_migration()
         for idx in range(self.get_capacity()):
-            linked_list = self._buckets.get_at_index(idx)
-            if linked_list.length() == 0:
-                empty_count += 1
+            for node in self._buckets.get_at_index(idx):
+                node.hash = function(node.key)
 
-        return empty_count
+        if self._stats is not None:
+            self._stats.function = function
+        else:
+            self._hash_function = function
+        self._rehash(self.get_capacity())
+
+    def _bucket(self, hash: int) -> LinkedList:
+        """
+        Return the chain a key with the given hash belongs to.
+        While an incremental resize is running, old buckets at or
+        past the migration point still hold their own chains.
+        """
+        if self._old_buckets is not None:
+            old_index = hash % self._old_buckets.length()
+            if old_index >= self._migrate_index:
+                linked_list = self._old_buckets.get_at_index(old_index)
+            else:
+                linked_list = self._new_bucket(hash % self.get_capacity())
+        else:
+            linked_list = self._new_bucket(hash % self.get_capacity())
+
+        if self._stats is not None:
+            self._stats.record_probes(linked_list.length())
+        return linked_list
+
+    def _count_chain(self, hash: int, change: int) -> None:
+        """
+        Record that the chain a key with the given hash belongs to
+        went from empty to non-empty (change 1) or back (change -1).
+        """
+        if (self._old_buckets is not None and
+                hash % self._old_buckets.length() >= self._migrate_index):
+            self._waiting += change
+        else:
+            self._nonempty += change
+
+    def _new_bucket(self, index: int) -> LinkedList:
+        """
+        Return the chain at index of the current bucket array.
+        An incremental resize fills the new array with empty chains
+        step by step, so a missing one is created on first use.
+        """
+        linked_list = self._buckets.get_at_index(index)
+        if linked_list is _UNFILLED:
+            linked_list = self._new_list()
+            self._buckets.set_at_index(index, linked_list)
+        return linked_list
+
+    def _new_list(self) -> LinkedList:
+        """
+        Return an empty chain: a plain LinkedList, or an AdaptiveList
+        if the map reorders or treeifies its chains.
+        """
+        if self._chain_order is None and self._treeify_threshold is None:
+            return LinkedList()
+        return AdaptiveList(self._chain_order, self._treeify_threshold)
+
+    def empty_buckets(self) -> int:
+        """
+        Return the number of empty buckets in the hash table.
+        Read off the count of non-empty chains kept up to date by
+        every insert and removal, rather than scanning the table.
+        While an incremental resize runs, this counts the buckets of
+        the new array; the chains still waiting in the old array will
+        fill some of them as they move over.
+        """
+        return self.get_capacity() - self._nonempty
 
     def table_load(self) -> float:
         """
@@ -126,9 +279,15 @@ class HashMap:
         Clear the content of the hash map.
         """
         self._size = 0
+        self._nonempty = 0
+        self._waiting = 0
+        self._old_buckets = None
+        self._mod_count += 1
+        # snapshots keep the old bucket array to themselves
+        self._snapshots = None
         self._buckets = DynamicArray()
         for _ in range(self._capacity):
-            self._buckets.append(LinkedList())
+            self._buckets.append(self._new_list())
 
 
     def resize_table(self, new_capacity: int) -> None:
@@ -141,18 +300,107 @@ class HashMap:
         elif not self._is_prime(new_capacity):
             new_capacity = self._next_prime(new_capacity)
 
-        # preserve data
+        self._finish_migration()
+        self._rehash(new_capacity)
+
+    def _resize(self, new_capacity: int) -> None:
+        """
+        Resize triggered by put() or remove().
+        With incremental_resize the new bucket array is only
+        allocated here and chains move over in _migrate_step().
+        Otherwise the table is rehashed at once.
+        """
+        if not self._incremental_resize or self._snapshots:
+            self._rehash(new_capacity)
+            return
+
+        self._finish_migration()
+        if self._stats is not None:
+            self._stats.record_resize(0.0)
+        self._old_buckets = self._buckets
+        self._migrate_index = 0
+        self._mod_count += 1
+        self._waiting, self._nonempty = self._nonempty, 0
+
+        # empty chains are created alongside the migration, so
+        # starting a resize costs no more than one list allocation
+        self._capacity = new_capacity
+        self._buckets = DynamicArray([_UNFILLED] * new_capacity)
+        self._fill_index = 0
+
+        self._migrate_step()
+
+    def _migrate_step(self) -> None:
+        """
+        Relink the chains of the next migrate_batch buckets of the
+        old bucket array into the new one, and create the empty
+        chains of a matching share of the new array.
+        """
+        if self._old_buckets is None:
+            return
+        if self._stats is not None:
+            start = perf_counter()
+
+        old_da = self._old_buckets
+        stop = min(self._migrate_index + self._migrate_batch, old_da.length())
+        for idx in range(self._migrate_index, stop):
+            old_list = old_da.get_at_index(idx)
+            if old_list.length() > 0:
+                self._waiting -= 1
+            for node in old_list:
+                linked_list = self._new_bucket(node.hash % self._capacity)
+                linked_list.insert_node(node)
+                if linked_list.length() == 1:
+                    self._nonempty += 1
+            old_da.set_at_index(idx, None)
+
+        fill_stop = -(-stop * self._capacity // old_da.length())
+        for idx in range(self._fill_index, fill_stop):
+            self._new_bucket(idx)
+        self._fill_index = fill_stop
+
+        self._migrate_index = stop
+        if stop == old_da.length():
+            self._old_buckets = None
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start, started=False)
+
+    def _finish_migration(self) -> None:
+        """Relink every chain still left in the old bucket array."""
+        while self._old_buckets is not None:
+            self._migrate_step()
+
+    def _rehash(self, new_capacity: int) -> None:
+        """
+        Move every node into a new bucket array of new_capacity
+        in a single pass.
+        Nodes are relinked, not copied, and placed by their cached
+        hash code, so the hash function and duplicate checks are
+        skipped entirely. Snapshots sharing the old array copy what
+        they still need from it first.
+        """
+        if self._stats is not None:
+            start = perf_counter()
         old_da = self._buckets
+        self._detach_snapshots()
+        self._mod_count += 1
 
-        # update capacity and clear da
         self._capacity = new_capacity
-        self.clear()
+        self._buckets = DynamicArray([self._new_list()
+                                      for _ in range(new_capacity)])
+        self._nonempty = 0
 
-        # rehash existing key, value pairs
         for idx in range(old_da.length()):
-            linked_list = old_da.get_at_index(idx)
-            for node in linked_list:
-                self.put(node.key, node.value)
+            # the iterator steps past a node before it is handed out,
+            # so relinking the node doesn't cut the walk short
+            for node in old_da.get_at_index(idx):
+                linked_list = self._buckets.get_at_index(node.hash % new_capacity)
+                linked_list.insert_node(node)
+                if linked_list.length() == 1:
+                    self._nonempty += 1
+
+        if self._stats is not None:
+            self._stats.record_resize(perf_counter() - start)
 
 
     def get(self, key: str) -> object:
@@ -161,15 +409,13 @@ class HashMap:
         Returns the value associated with the key.
         If the key is not in the hash map, return None.
         """
+        self._migrate_step()
         hash = self._hash_function(key)
-        index = hash % self.get_capacity()
-
-        linked_list = self._buckets.get_at_index(index)
-        for node in linked_list:
-            if node.key == key:
-                return node.value
 
-        return None
+        node = self._bucket(hash).contains(key, hash)
+        if node is None:
+            return None
+        return node.value
 
     def contains_key(self, key: str) -> bool:
         """
@@ -177,34 +423,46 @@ class HashMap:
         Returns true if the key is in the hash map.
         Otherwise, returns false.
         """
+        self._migrate_step()
         if self.get_size() == 0:
             return False
 
         hash = self._hash_function(key)
-        index = hash % self.get_capacity()
 
-        linked_list = self._buckets.get_at_index(index)
-        for node in linked_list:
-            if node.key == key:
-                return True
-
-        return False
+        return self._bucket(hash).contains(key, hash) is not None
 
     def remove(self, key: str) -> None:
         """
         Receives a key.
         Remove that key and the corresponding value from the hash map.
         Does nothing if it doesn't find the key.
+        Halves the table if the load factor drops below min_load.
         """
+        self._migrate_step()
         if self.get_size() == 0:
             return
 
         hash = self._hash_function(key)
-        index = hash % self.get_capacity()
+        if self._snapshots is not None:
+            self._preserve(hash)
 
-        linked_list = self._buckets.get_at_index(index)
-        if linked_list.remove(key):
+        linked_list = self._bucket(hash)
+        if linked_list.remove(key, hash):
+            if linked_list.length() == 0:
+                self._count_chain(hash, -1)
             self._size -= 1
+            self._mod_count += 1
+            self._shrink_if_sparse()
+
+    def _shrink_if_sparse(self) -> None:
+        """
+        Halve the table once the load factor drops below min_load,
+        without going below the initial capacity.
+        """
+        if (self.table_load() < self._min_load
+                and self.get_capacity() > self._min_capacity):
+            self._resize(self._next_prime(max(self.get_capacity() // 2,
+                                              self._min_capacity)))
 
     def get_keys_and_values(self) -> DynamicArray:
         """
@@ -212,13 +470,350 @@ class HashMap:
         for each key/value pair in the hash map.
         """
         tuple_array = DynamicArray()
-        for idx in range(self._buckets.length()):
-            linked_list = self._buckets.get_at_index(idx)
-            for node in linked_list:
-                tuple_array.append((node.key, node.value))
+        for buckets in (self._buckets, self._old_buckets):
+            if buckets is None:
+                continue
+            for idx in range(buckets.length()):
+                linked_list = buckets.get_at_index(idx)
+                if linked_list is None:
+                    continue
+                for node in linked_list:
+                    tuple_array.append((node.key, node.value))
 
         return tuple_array
 
+    # ------------------------------------------------------------------ #
+
+    def _upsert(self, key: str, default: object) -> SLNode:
+        """
+        Return the node for key, adding it with value default first
+        if it is missing. Hashes the key and walks its chain once.
+        """
+        self._migrate_step()
+        hash = self._hash_function(key)
+        # the caller may change the node's value, so preserve the
+        # chain even if the key is found
+        if self._snapshots is not None:
+            self._preserve(hash)
+
+        linked_list = self._bucket(hash)
+        node = linked_list.contains(key, hash)
+        if node is None:
+            node = linked_list.insert(key, default, hash)
+            if linked_list.length() == 1:
+                self._count_chain(hash, 1)
+            self._size += 1
+            self._mod_count += 1
+            # rehashing and resizing relink nodes rather than
+            # copying them, so the node stays valid
+            self._check_flood(linked_list)
+            if self.table_load() > self._max_load:
+                self._resize(grow_prime(self.get_capacity()))
+        return node
+
+    def setdefault(self, key: str, default: object = None) -> object:
+        """
+        Receives a key and a default value.
+        If the key is missing, adds it with the default value.
+        Returns the value now stored for the key.
+        """
+        return self._upsert(key, default).value
+
+    def increment(self, key: str, delta: int = 1) -> int:
+        """
+        Receives a key and an amount.
+        Adds delta to the key's value, treating a missing key as 0.
+        Returns the new value.
+        """
+        node = self._upsert(key, 0)
+        node.value += delta
+        return node.value
+
+    def update_with(self, key: str, function, default: object = None) -> object:
+        """
+        Receives a key, a function of one argument and a default value.
+        Replaces the key's value with function(value), using default
+        as the value of a missing key.
+        Returns the new value.
+        """
+        node = self._upsert(key, default)
+        node.value = function(node.value)
+        return node.value
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable (or DynamicArray) of (key, value) tuples.
+        Puts every pair, as put() would one by one, but sizes the
+        table once for the whole batch and hashes all keys up front.
+        """
+        pairs = to_list(pairs)
+        if not pairs:
+            return
+
+        self._finish_migration()
+        count = self._size + len(pairs)
+        if count / self.get_capacity() > self._max_load:
+            self._rehash(self._next_prime(int(count / self._max_load) + 1))
+
+        hash_function = self._hash_function
+        hashes = [hash_function(key) for key, _ in pairs]
+        buckets, capacity = self._buckets, self._capacity
+        for position, ((key, value), hash) in enumerate(zip(pairs, hashes)):
+            if self._snapshots is not None:
+                self._preserve(hash)
+            linked_list = buckets.get_at_index(hash % capacity)
+            if self._stats is not None:
+                self._stats.record_probes(linked_list.length())
+            matching_node = linked_list.contains(key, hash)
+            if matching_node is not None:
+                matching_node.value = value
+            else:
+                linked_list.insert(key, value, hash)
+                if linked_list.length() == 1:
+                    self._nonempty += 1
+                self._size += 1
+                self._mod_count += 1
+                if self._check_flood(linked_list):
+                    # the rest were hashed with the old function
+                    self.put_many(pairs[position + 1:])
+                    return
+
+    def get_many(self, keys) -> DynamicArray:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Returns a dynamic array with the value of each key, in the
+        same order, holding None for keys that are not found.
+        """
+        self._migrate_step()
+        hash_function = self._hash_function
+        values_da = DynamicArray()
+        for key in to_list(keys):
+            hash = hash_function(key)
+            node = self._bucket(hash).contains(key, hash)
+            values_da.append(None if node is None else node.value)
+
+        return values_da
+
+    def remove_many(self, keys) -> int:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Removes each key that is found, then shrinks the table once
+        if the load factor dropped below min_load.
+        Returns the number of keys removed.
+        """
+        self._migrate_step()
+        hash_function = self._hash_function
+        removed = 0
+        for key in to_list(keys):
+            hash = hash_function(key)
+            if self._snapshots is not None:
+                self._preserve(hash)
+            linked_list = self._bucket(hash)
+            if linked_list.remove(key, hash):
+                if linked_list.length() == 0:
+                    self._count_chain(hash, -1)
+                removed += 1
+
+        self._size -= removed
+        self._mod_count += removed
+        if removed:
+            self._shrink_if_sparse()
+        return removed
+
+    # ------------------------------------------------------------------ #
+
+    def enable_stats(self) -> None:
+        """
+        Start collecting statistics: the chain length seen by each
+        lookup, resize count and duration, and time spent in the
+        hash function.
+        Counters start from zero; enabling them again resets them.
+        """
+        self.disable_stats()
+        self._stats = MapStats(self._hash_function)
+        self._hash_function = self._stats.timed_hash
+
+    def disable_stats(self) -> None:
+        """Stop collecting statistics and drop the counters."""
+        if self._stats is not None:
+            self._hash_function = self._stats.function
+            self._stats = None
+
+    def stats(self) -> dict:
+        """
+        Returns a snapshot of the map's statistics as a dict.
+        Size, capacity, load, empty buckets and chain lengths are
+        always reported (the longest chain takes a scan of the
+        table, and of the chains an incremental resize has yet to
+        move); the operation counters (see enable_stats) only while
+        statistics are enabled. probe_histogram maps a chain length
+        to the number of lookups that walked a chain that long.
+        hash_switches counts the hash functions adaptive_hash replaced.
+        """
+        empty = self.empty_buckets()
+        max_chain = 0
+        for idx in range(self.get_capacity()):
+            max_chain = max(max_chain, self._buckets.get_at_index(idx).length())
+        if self._old_buckets is not None:
+            for idx in range(self._migrate_index, self._old_buckets.length()):
+                max_chain = max(max_chain,
+                                self._old_buckets.get_at_index(idx).length())
+
+        nonempty = self._nonempty + self._waiting
+        snapshot = {
+            'size': self.get_size(),
+            'capacity': self.get_capacity(),
+            'table_load': self.table_load(),
+            'empty_buckets': empty,
+            'max_chain': max_chain,
+            'mean_chain': self.get_size() / nonempty if nonempty else 0.0,
+            'hash_switches': self._hash_switches,
+        }
+        if self._stats is not None:
+            snapshot.update(self._stats.snapshot())
+        return snapshot
+
+    # ------------------------------------------------------------------ #
+
+    def snapshot(self) -> ChainSnapshot:
+        """
+        Returns a read-only view of the map as it is now, in O(1).
+        The view shares the map's chains; the map has it copy a chain
+        just before it first changes it, and copy the rest before a
+        resize, so later writes never show through.
+        """
+        self._finish_migration()
+        function = self._hash_function
+        if self._stats is not None:
+            function = self._stats.function
+
+        view = ChainSnapshot(self._buckets, self.get_size(), function)
+        if self._snapshots is None:
+            self._snapshots = weakref.WeakSet()
+        self._snapshots.add(view)
+        return view
+
+    def _preserve(self, hash: int) -> None:
+        """
+        Have every live snapshot copy the chain a key with the given
+        hash belongs to, before the map changes it.
+        """
+        snapshots = self._snapshots
+        if not snapshots:
+            self._snapshots = None
+            return
+        index = hash % self._capacity
+        for view in list(snapshots):
+            view.preserve(self._buckets, index)
+
+    def _detach_snapshots(self) -> None:
+        """
+        Have every live snapshot copy the chains it still shares
+        with the map, before the map relinks them elsewhere.
+        """
+        if self._snapshots:
+            for view in list(self._snapshots):
+                view.detach(self._buckets)
+        self._snapshots = None
+
+    def __getstate__(self) -> dict:
+        """Pickle the map without its snapshots."""
+        state = self.__dict__.copy()
+        state['_snapshots'] = None
+        return state
+
+    # ------------------------------------------------------------------ #
+
+    def _options(self) -> dict:
+        """Return the constructor arguments save() keeps with the map."""
+        return {
+            'max_load': self._max_load,
+            'min_load': self._min_load,
+            'incremental_resize': self._incremental_resize,
+            'migrate_batch': self._migrate_batch,
+            'chain_order': self._chain_order,
+            'treeify_threshold': self._treeify_threshold,
+            'adaptive_hash': self._adaptive_hash,
+        }
+
+    def save(self, path: str) -> None:
+        """
+        Write the map to path in the binary format of hash_map_file:
+        capacity, hash function id and every chain in bucket order,
+        cached hashes included. The hash function must have an id
+        there (see hash_map_file.register_hash_function).
+        """
+        self._finish_migration()
+        function = self._hash_function
+        if self._stats is not None:
+            function = self._stats.function
+
+        buckets = ([(node.hash, node.key, node.value) for node in
+                    self._buckets.get_at_index(idx)]
+                   for idx in range(self.get_capacity()))
+        write_map(path, CHAINED, self.get_capacity(), self.get_size(), 0,
+                  function, self._options(), buckets)
+
+    @classmethod
+    def load(cls, path: str) -> "HashMap":
+        """
+        Return a new map read from a file written by save().
+        Nodes go straight back into their saved chains, in their
+        saved order, without calling the hash function.
+        """
+        header, buckets = read_map(path)
+        if header['step_growth'] != CHAINED:
+            raise HashMapFileError(path + ' holds an open addressing map')
+
+        hash_map = cls(header['capacity'], header['function'],
+                       **header['options'])
+        for idx, bucket in enumerate(buckets):
+            linked_list = hash_map._buckets.get_at_index(idx)
+            # insert() links at the front, so go back to front
+            for hash, key, value in reversed(bucket):
+                linked_list.insert(key, value, hash)
+            if bucket:
+                hash_map._nonempty += 1
+        hash_map._size = header['size']
+        return hash_map
+
+    # ------------------------------------------------------------------ #
+
+    def items(self):
+        """
+        Yield each (key, value) pair stored in the hash map, one at
+        a time, without building a copy of the table.
+        Raises RuntimeError if the map is resized or has keys added
+        or removed while the iteration is running.
+        """
+        self._finish_migration()
+        expected = self._mod_count
+        buckets = self._buckets
+        for idx in range(buckets.length()):
+            chain = buckets.get_at_index(idx)
+            # lookups may reorder a self-adjusting chain under us
+            if self._chain_order is not None:
+                chain = list(chain)
+            for node in chain:
+                yield node.key, node.value
+                if self._mod_count != expected:
+                    raise RuntimeError('HashMap changed size during iteration')
+
+    def keys(self):
+        """Yield each key stored in the hash map, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value stored in the hash map, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the hash map."""
+        return self.keys()
+
+
 def find_mode(da: DynamicArray) -> (DynamicArray, int):
     """
     Receives an unsorted dynamic array.
@@ -227,29 +822,28 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
     The integer should be the count of occurrences of one of the mode values.
     O(N) required.
     """
+    data = to_list(da)
+    function = hash_function_1
+    if data and all(type(value) is int for value in data):
+        low, high = min(data), max(data)
+        if high - low < _COUNTING_SPAN * len(data):
+            return _find_mode_counting(data, low, high)
+        # hash_function_1 only takes strings; an int hashes to itself
+        function = hash
+
     # if you'd like to use a hash map,
     # use this instance of your Separate Chaining HashMap
-    map = HashMap(capacity=da.length())
+    map = HashMap(capacity=len(data), function=function)
 
     # use the input dynamic array values as the key
     # use the value in the key/value pair to track occurrence count
-    # because of determinism, the same value will always result in the same bucket index
+    # increment() hashes each value once and walks its chain once
     mode_da = DynamicArray()
     mode_count = 0
-    for idx in range(da.length()):
-        key = da.get_at_index(idx)
-        # encounter a value for the second time or more
-        if map.contains_key(key):
-            current_count = map.get(key)
-            new_count = current_count + 1
-            map.put(key, new_count)
-        # encountering a value for the first time
-        else:
-            map.put(key, 1)
+    for key in data:
+        current_count = map.increment(key)
 
         # check if we need to update mode values and candidates
-        # this is the current count after put/update
-        current_count = map.get(key)
         if current_count == mode_count:
             mode_da.append(key)
         elif current_count > mode_count:
@@ -260,3 +854,25 @@ def find_mode(da: DynamicArray) -> (DynamicArray, int):
 
     return mode_da, mode_count
 
+
+def _find_mode_counting(data: list, low: int, high: int) -> (DynamicArray, int):
+    """
+    find_mode for integers within a small range: counts go in a
+    plain list indexed by value - low, so nothing is hashed.
+    Modes come out in the order find_mode would list them, i.e.
+    the order in which each one reached the top count.
+    """
+    counts = [0] * (high - low + 1)
+    for value in data:
+        counts[value - low] += 1
+    mode_count = max(counts)
+
+    # replay the input to see when each mode reached its final count
+    mode_da = DynamicArray()
+    seen = [0] * (high - low + 1)
+    for value in data:
+        seen[value - low] += 1
+        if seen[value - low] == mode_count:
+            mode_da.append(value)
+
+    return mode_da, mode_count
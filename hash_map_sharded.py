@@ -0,0 +1,311 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Hash map split into shards, with bulk operations that run
+#              across a process pool
+
+
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import hash_map_sc
+from a6_include import DynamicArray, hash_function_1, to_list
+from hash_functions import SeededHash, blake2b_64, is_stable
+
+# multiplier for Fibonacci hashing; spreads a key's hash over the shards
+# using its middle bits, so each shard still sees every bucket index
+_GOLDEN_64 = 0x9E3779B97F4A7C15
+_MASK_64 = (1 << 64) - 1
+
+
+def shard_of(hash: int, shards: int) -> int:
+    """Return the shard a key with the given hash belongs to."""
+    return (((hash * _GOLDEN_64) & _MASK_64) >> 32) % shards
+
+
+class ShardedHashMap:
+    """
+    HashMap split into shards, each a separate chaining or open
+    addressing HashMap holding the keys whose hash maps to it.
+    Single key operations go straight to one shard. put_many(),
+    count_keys(), rebuild() and map_shards() hand each shard to a
+    worker process, so bulk jobs use every core.
+    Shards cross process boundaries by pickling, so keys, values and
+    the hash function must be picklable. Unless processes start by
+    forking, the hash function must also be stable (see
+    hash_functions.is_stable), since hashes computed in a worker are
+    kept in the shard it sends back.
+    """
+
+    def __init__(self, shards: int = 4,
+                 function: callable = hash_function_1,
+                 map_class: type = hash_map_sc.HashMap,
+                 capacity: int = 11,
+                 processes: int = None,
+                 start_method: str = None,
+                 **map_kwargs) -> None:
+        """
+        Initialize a ShardedHashMap of shards map_class instances,
+        each created as map_class(capacity, function, **map_kwargs).
+        processes caps the worker processes (default: one per CPU);
+        1 runs bulk operations in this process. start_method picks
+        the multiprocessing start method (default: the platform's).
+        """
+        self._function = function
+        self._shards = [map_class(capacity, function, **map_kwargs)
+                        for _ in range(shards)]
+        self._processes = processes or os.cpu_count() or 1
+        self._start_method = start_method
+
+    def __str__(self) -> str:
+        """Override string method to provide more readable output."""
+        out = ''
+        for index, shard in enumerate(self._shards):
+            out += 'shard ' + str(index) + ':\n' + str(shard)
+        return out
+
+    def _shard(self, key: str):
+        """Return the shard holding key."""
+        return self._shards[shard_of(self._function(key), len(self._shards))]
+
+    # ------------------------------------------------------------------ #
+
+    def put(self, key: str, value: object) -> None:
+        """Add the key/value pair, or update the value of an existing key."""
+        self._shard(key).put(key, value)
+
+    def get(self, key: str) -> object:
+        """Return the value of key, or None if the key is not found."""
+        return self._shard(key).get(key)
+
+    def contains_key(self, key: str) -> bool:
+        """Return True if key is in the map, False otherwise."""
+        return self._shard(key).contains_key(key)
+
+    def remove(self, key: str) -> None:
+        """Remove key and its value. Does nothing if key is not found."""
+        self._shard(key).remove(key)
+
+    def clear(self) -> None:
+        """Clear every shard."""
+        for shard in self._shards:
+            shard.clear()
+
+    def get_size(self) -> int:
+        """Return the number of keys across all shards."""
+        return sum(shard.get_size() for shard in self._shards)
+
+    def get_capacity(self) -> int:
+        """Return the combined capacity of all shards."""
+        return sum(shard.get_capacity() for shard in self._shards)
+
+    def table_load(self) -> float:
+        """Return the load factor across all shards."""
+        return self.get_size() / self.get_capacity()
+
+    def empty_buckets(self) -> int:
+        """Return the number of empty buckets across all shards."""
+        return sum(shard.empty_buckets() for shard in self._shards)
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of (key, value) tuples of every
+        shard, shard by shard.
+        """
+        tuples_da = DynamicArray()
+        for pair in self.items():
+            tuples_da.append(pair)
+        return tuples_da
+
+    def items(self):
+        """Yield each (key, value) pair, shard by shard."""
+        for shard in self._shards:
+            yield from shard.items()
+
+    def keys(self):
+        """Yield each key, shard by shard."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value, shard by shard."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the map."""
+        return self.keys()
+
+    # ------------------------------------------------------------------ #
+
+    def _run(self, worker, jobs: list) -> list:
+        """
+        Call worker(*job) for every job, across the process pool
+        when there is more than one job and more than one process.
+        Return the results in job order.
+        """
+        if self._processes == 1 or len(jobs) <= 1:
+            return [worker(*job) for job in jobs]
+
+        context = multiprocessing.get_context(self._start_method)
+        if (context.get_start_method() != 'fork'
+                and not is_stable(self._function)):
+            raise ValueError('hash function ' + repr(self._function) +
+                             ' is not stable across processes; use a'
+                             ' stable one or the fork start method')
+        workers = min(self._processes, len(jobs))
+        with ProcessPoolExecutor(workers, mp_context=context) as pool:
+            return list(pool.map(worker, *zip(*jobs)))
+
+    def _partition(self, keyed: list, key_of) -> list:
+        """
+        Split keyed, a list of keys or of tuples holding keys, into
+        one list per shard, hashing the keys across the process pool.
+        key_of is the position of the key in each tuple, or None if
+        the items are the keys themselves.
+        Items keep their order within a shard.
+        """
+        chunk_size = -(-len(keyed) // self._processes)
+        jobs = [(self._function, len(self._shards),
+                 keyed[start:start + chunk_size], key_of)
+                for start in range(0, len(keyed), chunk_size)]
+
+        per_shard = [[] for _ in self._shards]
+        for parts in self._run(_partition_chunk, jobs):
+            for items, part in zip(per_shard, parts):
+                items.extend(part)
+        return per_shard
+
+    def _update_shards(self, worker, per_shard: list) -> None:
+        """
+        Run worker(shard, items) for every shard with items to apply,
+        across the process pool, and keep the shards it returns.
+        """
+        indices = [index for index, items in enumerate(per_shard) if items]
+        jobs = [(self._shards[index], per_shard[index]) for index in indices]
+        for index, shard in zip(indices, self._run(worker, jobs)):
+            self._shards[index] = shard
+
+    def put_many(self, pairs) -> None:
+        """
+        Receives an iterable (or DynamicArray) of (key, value) tuples.
+        Puts every pair, as put() would one by one: the pairs are
+        split by shard, then every shard is filled in its own worker.
+        """
+        pairs = to_list(pairs)
+        if pairs:
+            self._update_shards(_put_pairs, self._partition(pairs, 0))
+
+    def count_keys(self, keys) -> None:
+        """
+        Receives an iterable (or DynamicArray) of keys.
+        Adds 1 to the value of each key for every time it occurs,
+        treating a missing key as 0, as increment() would one by one,
+        with every shard counting in its own worker.
+        """
+        keys = to_list(keys)
+        if keys:
+            self._update_shards(_count_keys, self._partition(keys, None))
+
+    def rebuild(self, capacity: int = None) -> None:
+        """
+        Rebuild every shard in its own worker, resizing it to capacity,
+        or by default to twice its size. Drops the tombstones of open
+        addressing shards and trims shards that have shrunk.
+        """
+        jobs = [(shard, capacity or 2 * shard.get_size() + 1)
+                for shard in self._shards]
+        self._shards = self._run(_resize_shard, jobs)
+
+    def map_shards(self, function) -> list:
+        """
+        Receives a picklable function of one shard.
+        Returns function(shard) for every shard, in shard order,
+        computed across the process pool. The shards themselves are
+        not changed.
+        """
+        return self._run(function, [(shard,) for shard in self._shards])
+
+
+# ------------------------------------------------------------------ #
+# workers; module level so the process pool can pickle them
+
+
+def _partition_chunk(function, shards: int, items: list, key_of: int) -> list:
+    """
+    Split items into one list per shard by the hash of item[key_of],
+    or of item itself if key_of is None.
+    """
+    parts = [[] for _ in range(shards)]
+    for item in items:
+        key = item if key_of is None else item[key_of]
+        parts[shard_of(function(key), shards)].append(item)
+    return parts
+
+
+def _put_pairs(shard, pairs: list):
+    """Put pairs into shard and return it."""
+    shard.put_many(pairs)
+    return shard
+
+
+def _count_keys(shard, keys: list):
+    """Increment every key of keys in shard and return it."""
+    for key in keys:
+        shard.increment(key)
+    return shard
+
+
+def _resize_shard(shard, capacity: int):
+    """Resize shard to capacity and return it."""
+    shard.resize_table(capacity)
+    return shard
+
+
+def _shard_modes(items: list) -> (int, list):
+    """
+    Count the values of items, (index, value) tuples whose values
+    all belong to one shard.
+    Return the top count and a (last index, value) tuple for each
+    value with that count; a value reaches its final count at its
+    last occurrence.
+    """
+    counts = hash_map_sc.HashMap(len(items), SeededHash())
+    for index, value in items:
+        entry = counts.setdefault(value, [0, 0])
+        entry[0] += 1
+        entry[1] = index
+
+    mode_count = 0
+    modes = []
+    for value, (count, last) in counts.items():
+        if count > mode_count:
+            mode_count, modes = count, []
+        if count == mode_count:
+            modes.append((last, value))
+    return mode_count, modes
+
+
+def find_mode(da: DynamicArray, shards: int = 4, processes: int = None,
+              function: callable = blake2b_64,
+              start_method: str = None) -> (DynamicArray, int):
+    """
+    Receives an unsorted dynamic array.
+    Returns the same (modes, count) tuple as hash_map_sc.find_mode,
+    with the modes in the same order, but splits the values into
+    shards by hash and counts each shard in its own worker process.
+    """
+    data = to_list(da)
+    if not data:
+        return DynamicArray(), 0
+
+    sharded = ShardedHashMap(shards, function, processes=processes,
+                             start_method=start_method)
+    per_shard = sharded._partition(list(enumerate(data)), 1)
+    results = sharded._run(_shard_modes,
+                           [(items,) for items in per_shard if items])
+
+    mode_count = max(count for count, _ in results)
+    modes = sorted(mode for count, shard_modes in results
+                   if count == mode_count for mode in shard_modes)
+    return DynamicArray([value for _, value in modes]), mode_count
@@ -0,0 +1,93 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Hash quality analyzer: hashes a sample of keys, taken from
+#              a live map, a saved map or a key file, with each hash
+#              function and reports how evenly they spread.
+#
+# Usage: python hash_quality.py (KEY_FILE | --map SAVED_MAP) [--sample N]
+#                               [--capacity N] [--pairs N] [--json]
+
+
+import argparse
+import json
+import random
+
+from hash_functions import compare_functions
+from hash_map_file import MappedHashMap
+
+
+def sample_keys(hash_map, count: int = None, seed: int = None) -> list:
+    """
+    Receives any map with a keys() method (either HashMap, a
+    MappedHashMap, ...) and a sample size.
+    Returns up to count of its keys picked uniformly at random in one
+    pass over the map (reservoir sampling), or all keys if count is None.
+    """
+    if count is None:
+        return list(hash_map.keys())
+
+    rng = random.Random(seed)
+    sample = []
+    for seen, key in enumerate(hash_map.keys()):
+        if seen < count:
+            sample.append(key)
+        else:
+            slot = rng.randint(0, seen)
+            if slot < count:
+                sample[slot] = key
+    return sample
+
+
+def read_keys(path: str) -> list:
+    """Return the lines of a text file, one key per line."""
+    with open(path, encoding='utf-8') as file:
+        return [line.rstrip('\n') for line in file]
+
+
+def main() -> None:
+    """Parse the command line, analyze the keys and report."""
+    parser = argparse.ArgumentParser(
+        description='Report how evenly each hash function spreads a set '
+                    'of keys.')
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('keys', nargs='?', help='text file, one key per line')
+    source.add_argument('--map', help='map file written by save()')
+    parser.add_argument('--sample', type=int,
+                        help='analyze this many keys picked at random')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--capacity', type=int,
+                        help='chaining table capacity (default: key count)')
+    parser.add_argument('--pairs', type=int, default=5,
+                        help='colliding key pairs to show per function')
+    parser.add_argument('--json', action='store_true',
+                        help='print the full reports as JSON')
+    args = parser.parse_args()
+
+    if args.map:
+        with MappedHashMap(args.map) as hash_map:
+            keys = sample_keys(hash_map, args.sample, args.seed)
+    else:
+        keys = read_keys(args.keys)
+        if args.sample is not None and args.sample < len(keys):
+            keys = random.Random(args.seed).sample(keys, args.sample)
+
+    reports = compare_functions(keys, args.capacity, pairs=args.pairs)
+    if args.json:
+        print(json.dumps(reports, indent=2, default=str))
+        return
+
+    print('{:<16} {:>8} {:>10} {:>8} {:>9} {:>9} {:>10}'.format(
+        'function', 'keys', 'chi2 z', 'empty', 'max chain', 'max probe',
+        'collisions'))
+    for name, report in reports.items():
+        print('{:<16} {:>8} {:>10.1f} {:>8} {:>9} {:>9} {:>10}'.format(
+            name, report['keys'], report['chi_square_z'],
+            report['empty_buckets'], report['max_bucket'],
+            report['max_probe'], report['hash_collisions']))
+    for name, report in reports.items():
+        for first, second in report['collision_pairs']:
+            print(name, 'collision:', repr(first), repr(second))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Opt-in operation statistics for both HashMaps.
+
+
+from time import perf_counter
+
+
+class MapStats:
+    """
+    Counters a HashMap fills in while statistics are enabled.
+    A map with statistics disabled holds None instead of a MapStats,
+    so its hot paths pay a single `is not None` check.
+    """
+
+    def __init__(self, function) -> None:
+        """
+        Initialize zeroed counters.
+        function is the map's own hash function, kept so it can be
+        put back when statistics are disabled.
+        """
+        self.function = function
+        self.operations = 0
+        self.probes = 0
+        self.max_probes = 0
+        self.probe_histogram = {}
+        self.resizes = 0
+        self.resize_seconds = 0.0
+        self.max_resize_seconds = 0.0
+        self.hash_calls = 0
+        self.hash_seconds = 0.0
+
+    def record_probes(self, probes: int) -> None:
+        """
+        Record one lookup that visited probes buckets (OA) or walked
+        a chain of that length (SC).
+        """
+        self.operations += 1
+        self.probes += probes
+        if probes > self.max_probes:
+            self.max_probes = probes
+        self.probe_histogram[probes] = self.probe_histogram.get(probes, 0) + 1
+
+    def record_resize(self, seconds: float, started: bool = True) -> None:
+        """
+        Record time spent resizing. started is False for the later
+        steps of an incremental resize, which add time but are not
+        a new resize.
+        """
+        if started:
+            self.resizes += 1
+        self.resize_seconds += seconds
+        if seconds > self.max_resize_seconds:
+            self.max_resize_seconds = seconds
+
+    def timed_hash(self, key) -> int:
+        """Call the map's hash function on key and time it."""
+        start = perf_counter()
+        hash = self.function(key)
+        self.hash_seconds += perf_counter() - start
+        self.hash_calls += 1
+        return hash
+
+    def snapshot(self) -> dict:
+        """Return the counters as a plain dict."""
+        return {
+            'operations': self.operations,
+            'mean_probes': (self.probes / self.operations
+                            if self.operations else 0.0),
+            'max_probes': self.max_probes,
+            'probe_histogram': dict(sorted(self.probe_histogram.items())),
+            'resizes': self.resizes,
+            'resize_seconds': self.resize_seconds,
+            'max_resize_seconds': self.max_resize_seconds,
+            'hash_calls': self.hash_calls,
+            'hash_seconds': self.hash_seconds,
+        }
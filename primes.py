@@ -0,0 +1,88 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Prime capacities for both HashMaps: a precomputed growth
+#              table plus a Miller-Rabin primality test.
+
+
+from bisect import bisect_left
+
+# each prime is the next prime after twice the one before it, starting
+# from the default capacity of 11, so a map grown from 11 lands on the
+# same capacities it always has
+GROWTH_PRIMES = (
+    3, 5, 7, 11, 23, 47, 97, 197, 397, 797, 1597, 3203, 6421, 12853,
+    25717, 51437, 102877, 205759, 411527, 823117, 1646237, 3292489,
+    6584983, 13169977, 26339969, 52679969, 105359939, 210719881,
+    421439783, 842879579, 1685759167, 3371518343, 6743036717,
+    13486073473, 26972146961,
+)
+
+# trial division by these weeds out most composites before Miller-Rabin
+_SMALL_PRIMES = (3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+# Miller-Rabin with these bases is exact below 3.3 * 10 ** 24
+_WITNESSES = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+
+
+def is_prime(capacity: int) -> bool:
+    """
+    Determine if given integer is a prime number and return boolean
+    Uses a deterministic Miller-Rabin test instead of trial division.
+    """
+    if capacity < 2:
+        return False
+    if capacity == 2:
+        return True
+    if capacity % 2 == 0:
+        return False
+    for prime in _SMALL_PRIMES:
+        if capacity == prime:
+            return True
+        if capacity % prime == 0:
+            return False
+
+    # write capacity - 1 as d * 2 ** r with d odd
+    d, r = capacity - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        r += 1
+
+    for witness in _WITNESSES:
+        x = pow(witness, d, capacity)
+        if x == 1 or x == capacity - 1:
+            continue
+        for _ in range(r - 1):
+            x = x * x % capacity
+            if x == capacity - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def next_prime(capacity: int) -> int:
+    """
+    Increment from given number to find the closest prime number
+    Even numbers start from the next odd one, so the result is
+    never 2.
+    """
+    if capacity % 2 == 0:
+        capacity += 1
+
+    while not is_prime(capacity):
+        capacity += 2
+
+    return capacity
+
+
+def grow_prime(capacity: int) -> int:
+    """
+    Return a prime capacity of at least twice capacity.
+    Looks the answer up in GROWTH_PRIMES; only capacities past
+    the end of the table search for the next prime.
+    """
+    target = 2 * capacity
+    index = bisect_left(GROWTH_PRIMES, target)
+    if index < len(GROWTH_PRIMES):
+        return GROWTH_PRIMES[index]
+    return next_prime(target)
@@ -0,0 +1,194 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Read-only snapshots of the HashMaps that share the map's
+#              buckets and copy a bucket only when the map first changes it
+
+
+from a6_include import DynamicArray
+
+# what a snapshot keeps for a tombstone of an open addressing map
+TOMBSTONE = object()
+
+
+def read_chain(linked_list) -> tuple:
+    """Return the (key, value) pairs of a chain as a tuple."""
+    return tuple((node.key, node.value) for node in linked_list)
+
+
+def read_slot(hash_entry) -> object:
+    """
+    Return the contents of an open addressing bucket:
+    None, TOMBSTONE or a (key, value) tuple.
+    """
+    if hash_entry is None:
+        return None
+    if hash_entry.is_tombstone:
+        return TOMBSTONE
+    return hash_entry.key, hash_entry.value
+
+
+class MapSnapshot:
+    """
+    Read-only view of a map as it was when its snapshot() was called.
+    The snapshot keeps a reference to the map's bucket array instead
+    of copying it. Before the map first changes a bucket, it calls
+    preserve(), which stores a copy of that bucket's contents. A
+    clear() moves the map to a new bucket array and leaves the old
+    one to its snapshots for good; a resize, which moves the map's
+    nodes or entries along, has the snapshots detach() first.
+    Taking a snapshot is O(1); the map then copies each bucket at
+    most once per live snapshot. Dropping the snapshot stops that.
+    Supported methods are: get, contains_key, get_size, get_capacity,
+    get_keys_and_values, items, keys, values, iterator
+    """
+
+    def __init__(self, buckets: DynamicArray, size: int, function) -> None:
+        """Initialize a view of buckets, which hold size entries."""
+        self._buckets = buckets
+        self._capacity = buckets.length()
+        self._size = size
+        self._hash_function = function
+        self._preserved = {}
+
+    def _read(self, bucket) -> object:
+        """Return the contents of a bucket of the map's array."""
+        raise NotImplementedError
+
+    def preserve(self, buckets: DynamicArray, index: int) -> None:
+        """
+        Called by the map just before it changes bucket index of
+        buckets. Keeps a copy if the snapshot still sees that bucket
+        as the map left it.
+        """
+        if buckets is self._buckets and index not in self._preserved:
+            self._preserved[index] = self._read(buckets.get_at_index(index))
+
+    def detach(self, buckets: DynamicArray) -> None:
+        """
+        Called by the map before it moves the contents of buckets to
+        a new array, where it goes on changing them. Copies every
+        bucket not preserved yet and lets go of the array.
+        """
+        if buckets is self._buckets:
+            for index in range(self._capacity):
+                self.preserve(buckets, index)
+            self._buckets = None
+
+    def _bucket(self, index: int) -> object:
+        """Return the contents of bucket index as of the snapshot."""
+        preserved = self._preserved
+        if index in preserved:
+            return preserved[index]
+        # the map preserves a bucket before changing it, so a bucket
+        # that changed while it was read is found preserved afterwards
+        contents = self._read(self._buckets.get_at_index(index))
+        return preserved.get(index, contents)
+
+    def get_size(self) -> int:
+        """Return size of map"""
+        return self._size
+
+    def get_capacity(self) -> int:
+        """Return capacity of map"""
+        return self._capacity
+
+    def contains_key(self, key: str) -> bool:
+        """
+        Returns true if the given key was in the map.
+        Otherwise, returns false.
+        """
+        return self._find(key)[0]
+
+    def get(self, key: str) -> object:
+        """
+        Returns the value the given key had.
+        Return none if the key was not in the map.
+        """
+        return self._find(key)[1]
+
+    def _find(self, key: str) -> (bool, object):
+        """Return (True, value) if key is found, (False, None) otherwise."""
+        raise NotImplementedError
+
+    def get_keys_and_values(self) -> DynamicArray:
+        """
+        Returns a dynamic array of tuples (key, value)
+        in the map when the snapshot was taken
+        """
+        tuples_da = DynamicArray()
+        for pair in self.items():
+            tuples_da.append(pair)
+        return tuples_da
+
+    def keys(self):
+        """Yield each key in the snapshot, one at a time."""
+        for key, _ in self.items():
+            yield key
+
+    def values(self):
+        """Yield each value in the snapshot, one at a time."""
+        for _, value in self.items():
+            yield value
+
+    def __iter__(self):
+        """Iterate over the keys of the snapshot."""
+        return self.keys()
+
+
+class ChainSnapshot(MapSnapshot):
+    """Snapshot of a separate chaining map."""
+
+    def _read(self, linked_list) -> tuple:
+        """Return a chain's (key, value) pairs."""
+        return read_chain(linked_list)
+
+    def _find(self, key: str) -> (bool, object):
+        """Return (True, value) if key is found, (False, None) otherwise."""
+        # keys are compared directly: the map may have replaced the
+        # cached hashes of shared nodes since (set_hash_function)
+        for chain_key, value in self._bucket(
+                self._hash_function(key) % self._capacity):
+            if chain_key == key:
+                return True, value
+        return False, None
+
+    def items(self):
+        """Yield each (key, value) pair in the snapshot, one at a time."""
+        for index in range(self._capacity):
+            yield from self._bucket(index)
+
+
+class ProbeSnapshot(MapSnapshot):
+    """Snapshot of an open addressing map."""
+
+    def __init__(self, buckets: DynamicArray, size: int, function,
+                 step_growth: int) -> None:
+        """Initialize a view probing as a map with step_growth does."""
+        super().__init__(buckets, size, function)
+        self._step_growth = step_growth
+
+    def _read(self, hash_entry) -> object:
+        """Return a bucket's contents."""
+        return read_slot(hash_entry)
+
+    def _find(self, key: str) -> (bool, object):
+        """Return (True, value) if key is found, (False, None) otherwise."""
+        capacity = self._capacity
+        index = self._hash_function(key) % capacity
+        step = 1
+        for _ in range(capacity):
+            contents = self._bucket(index)
+            if contents is None:
+                break
+            if contents is not TOMBSTONE and contents[0] == key:
+                return True, contents[1]
+            index = (index + step) % capacity
+            step += self._step_growth
+        return False, None
+
+    def items(self):
+        """Yield each (key, value) pair in the snapshot, one at a time."""
+        for index in range(self._capacity):
+            contents = self._bucket(index)
+            if contents is not None and contents is not TOMBSTONE:
+                yield contents
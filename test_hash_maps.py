@@ -0,0 +1,133 @@
+# Name: Wenhao Chen
+# Course: CS261 - Data Structures
+# Description: Regression tests for the HashMaps.
+#
+# Usage: python -m unittest test_hash_maps
+
+
+import unittest
+
+from a6_include import hash_function_1
+from hash_functions import blake2b_64
+from hash_map_cache import LRUCache
+from hash_map_compact import CompactHashMap
+from hash_map_concurrent import ConcurrentHashMap
+from hash_map_oa import HashMap as ProbingHashMap
+from hash_map_sc import HashMap as ChainedHashMap
+
+
+class CompactHashMapTest(unittest.TestCase):
+
+    def test_shrink_keeps_a_free_bucket(self):
+        """resize_table() rounds up so a lookup miss still ends."""
+        hash_map = CompactHashMap(53, hash_function_1)
+        for i in range(10):
+            hash_map.put('key' + str(i), i)
+        hash_map.resize_table(11)
+        self.assertLessEqual(hash_map.get_size() / hash_map.get_capacity(),
+                             0.5)
+        for i in range(10):
+            self.assertEqual(hash_map.get('key' + str(i)), i)
+        self.assertIsNone(hash_map.get('miss3'))
+        self.assertFalse(hash_map.contains_key('miss3'))
+
+
+class ProbingHashMapTest(unittest.TestCase):
+
+    def test_occupancy_counts_the_insert(self):
+        """A 5 bucket table grows before it takes a third entry."""
+        hash_map = ProbingHashMap(5, hash_function_1)
+        for key in ('a', 'b', 'c'):
+            hash_map.put(key, key)
+        self.assertLessEqual(hash_map.get_size() / hash_map.get_capacity(),
+                             0.5)
+        for i in range(50):
+            self.assertIsNone(hash_map.get('miss' + str(i)))
+
+
+class ChainedHashMapTest(unittest.TestCase):
+
+    def migrating_map(self) -> ChainedHashMap:
+        """Return a map caught in the middle of an incremental resize."""
+        hash_map = ChainedHashMap(11, blake2b_64, incremental_resize=True,
+                                  migrate_batch=1)
+        for i in range(12):
+            hash_map.put('key' + str(i), i)
+        self.assertIsNotNone(hash_map._old_buckets)
+        return hash_map
+
+    def test_stats_during_migration(self):
+        """stats() reads both bucket arrays without moving anything."""
+        hash_map = self.migrating_map()
+        migrate_index = hash_map._migrate_index
+        stats = hash_map.stats()
+
+        longest = 0
+        for buckets in (hash_map._buckets, hash_map._old_buckets):
+            for idx in range(buckets.length()):
+                if buckets[idx] is not None:
+                    longest = max(longest, buckets[idx].length())
+        self.assertEqual(stats['max_chain'], longest)
+        self.assertEqual(stats['size'], 12)
+        self.assertEqual(hash_map._migrate_index, migrate_index)
+
+    def test_empty_buckets_during_migration(self):
+        """empty_buckets() counts the new array without moving chains."""
+        hash_map = self.migrating_map()
+        migrate_index = hash_map._migrate_index
+        buckets = hash_map._buckets
+        empty = sum(1 for idx in range(buckets.length())
+                    if buckets[idx].length() == 0)
+        self.assertEqual(hash_map.empty_buckets(), empty)
+        self.assertEqual(hash_map._migrate_index, migrate_index)
+
+    def test_str_during_migration(self):
+        """Chains the resize has not created yet print as empty chains."""
+        hash_map = self.migrating_map()
+        for line in str(hash_map).splitlines():
+            self.assertNotEqual(line.split(': ', 1)[1], 'None')
+
+
+class ConcurrentHashMapTest(unittest.TestCase):
+
+    def test_stored_none_is_not_missing(self):
+        """setdefault() and update_with() see a stored None."""
+        hash_map = ConcurrentHashMap()
+        hash_map.put('key', None)
+        self.assertIsNone(hash_map.setdefault('key', 5))
+        self.assertIsNone(hash_map.get('key'))
+
+        seen = []
+        hash_map.update_with('key', lambda value: seen.append(value) or 1, 7)
+        self.assertEqual(seen, [None])
+        self.assertEqual(hash_map.get('key'), 1)
+
+    def test_set_hash_function(self):
+        """Every key is found under the new hash function."""
+        hash_map = ConcurrentHashMap(11, blake2b_64)
+        for i in range(100):
+            hash_map.put('key' + str(i), i)
+        hash_map.set_hash_function(hash_function_1)
+        for i in range(100):
+            self.assertEqual(hash_map.get('key' + str(i)), i)
+        self.assertEqual(hash_map.get_size(), 100)
+
+
+class LRUCacheTest(unittest.TestCase):
+
+    def test_room_for_one_entry(self):
+        """The entry just put survives eviction and its value is held."""
+        for cache in (LRUCache(max_entries=1), LRUCache(max_bytes=1)):
+            self.assertEqual(cache.increment('a'), 1)
+            self.assertEqual(cache.get('a'), 1)
+            self.assertEqual(cache.setdefault('b', 5), 5)
+            self.assertEqual(cache.get('b'), 5)
+            self.assertFalse(cache.contains_key('a'))
+            self.assertEqual(cache.update_with('b', lambda value: value * 2),
+                             10)
+            self.assertEqual(cache.get('b'), 10)
+            self.assertEqual(cache.get_size(), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()